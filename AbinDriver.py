@@ -25,6 +25,9 @@ from model.HypothesisRefinement import AbductionSchema
 from controller.AbinLogging import Worker
 from model.misc.test_db_connection import test_db_connection
 import model.misc.bug_mining as bug_mining
+import model.misc.pattern_index as pattern_index
+import model.misc.migrate_patterns as migrate_patterns
+import model.misc.pattern_groups as pattern_groups
 import controller.AbinLogging as AbinLogging
 from matplotlib.ticker import MaxNLocator
 
@@ -327,9 +330,12 @@ class AbinDriver(AbinView):
 
     def runAutoDebug(self):
         """ This method execute the AutoDebugTask in a Qthread """
-        if DebugController.DB_STATUS == DebugController.ConnectionStatus.Undefined:
+        if DebugController.OFFLINE_PATTERN_INDEX:
+            if not pattern_index.is_available():
+                return QMessageBox.warning(self, "Warning!", "<p>Please export the local pattern index.</p>")
+        elif DebugController.DB_STATUS == DebugController.ConnectionStatus.Undefined:
             return QMessageBox.warning(self, "Warning!", "<p>Please connect a Database.</p>")
-        if DebugController.DB_STATUS == DebugController.ConnectionStatus.Established:
+        elif DebugController.DB_STATUS == DebugController.ConnectionStatus.Established:
             return QMessageBox.warning(self, "Warning!", "<p>Please make sure to connect a Database with patterns.</p>")
         if self.csvTestSuite is None:
             return QMessageBox.warning(self, "Warning!", "<p>Please provide a test suite!.</p>")
@@ -388,7 +394,10 @@ class AbinDriver(AbinView):
                                         self.max_complexity, 
                                         self.abduction_schema)
         AbinLogging.debugging_logger.info('Starting Debugging Process...')
-        result = abinDebugger.start_auto_debugging()
+        try:
+            result = abinDebugger.start_auto_debugging()
+        finally:
+            abinDebugger.close()
         AbinLogging.debugging_logger.info('Debugging Process Finalized.')
         (model_name, behavior, prev_observation, new_observation) = result
         AbinLogging.debugging_logger.info(f"""
@@ -515,7 +524,11 @@ class AbinDriver(AbinView):
         db_connection = CONN.mongodb_connection()
         collection_RepoData = db_connection[nameReposCollection]
         collection_BugPatterns = db_connection[namePatternsCollection]
-        
+        collection_PatternGroups = db_connection[pattern_groups.get_groups_collection_name(namePatternsCollection)]
+        migrate_patterns.create_pattern_indexes(collection_BugPatterns)
+        pattern_groups.create_group_indexes(collection_PatternGroups)
+        pattern_groups.ensure_pattern_groups(collection_BugPatterns, collection_PatternGroups)
+
         remaining_repos = self.lstRepos.count()
         AbinLogging.mining_logger.info(
             f"Starting to Mine {remaining_repos} Repositories."
@@ -542,6 +555,7 @@ class AbinDriver(AbinView):
             if bugfixes_data:
                 insert_result_RepoData = collection_RepoData.insert_one(repo_data.copy())
                 insert_result_BugPatterns = collection_BugPatterns.insert_many(bugfixes_data.copy())
+                pattern_groups.upsert_pattern_groups(collection_PatternGroups, bugfixes_data)
             else:
                 AbinLogging.mining_logger.info(
                     f"Empty!, No commits were mined from repository {owner}/{name}."
@@ -5,10 +5,16 @@ This is the model representation of the MVC software pattern.
 import sys
 from typing import List, Type, Optional, Tuple, Union
 from types import TracebackType
-from model.core.ModelTester import TestCase, Observation, InfluencePath
+from model.core.ModelTester import TestCase, Observation, InfluencePath, TestBaseline, PassedTest
+from model.core.OutputComparator import OutputComparator
+from model.core.OutcomeStore import OutcomeStore, StoreKey
+from model.core.PatternCache import PatternCache
+from model.core.PatternStats import PatternStats
+from model.core.HypothesisProducer import HypothesisProducer
+from model.core.TestScheduler import TestScheduler
 from model.FaultLocalizator import FaultLocalizator
-from model.HyphotesisTester import Behavior, HyphotesisTester
-from model.HypothesisGenerator import Hypothesis, HypothesisGenerator
+from model.HyphotesisTester import Behavior, HyphotesisTester, ModelConstructor
+from model.HypothesisGenerator import Hypothesis, HypothesisGenerator, PatternScheduler
 from model.HypothesisRefinement import AbductionSchema
 import pandas as pd
 import controller.AbinLogging as AbinLogging
@@ -31,6 +37,12 @@ class AbinModel():
     max_complexity: int
     candidate: int
     bugfixing_hyphotesis: str
+    output_comparator: OutputComparator
+    test_scheduler: TestScheduler
+    outcome_store: Union[OutcomeStore, None]
+    pattern_cache: PatternCache
+    fix_template_cache: PatternCache
+    pattern_scheduler: Union[PatternScheduler, None]
 
     def __init__(self, function_name: str, bugged_file_path: str, test_suite: List[TestCase],
                 max_complexity: int, abduction_schema: AbductionSchema = AbductionSchema.DFS,
@@ -50,6 +62,24 @@ class AbinModel():
         self.fault_localizator = localizator
         self.hyphotesis_tester = tester
         self.hypotheses_generator = generator
+        # The expected outputs are canonicalized once for the whole session.
+        self.output_comparator = OutputComparator(test_suite)
+        # The test cases' kill rates are learned during the whole session.
+        self.test_scheduler = TestScheduler()
+        # The matching patterns and their fix templates are shared by the generators of all the refinements.
+        self.pattern_cache = PatternCache(DebugController.PATTERN_CACHE_CAPACITY)
+        self.fix_template_cache = PatternCache(DebugController.FIX_TEMPLATE_CACHE_CAPACITY)
+        self.pattern_scheduler = None
+        if DebugController.PATTERN_SCHEDULING:
+            self.pattern_scheduler = PatternScheduler(PatternStats(DebugController.PATTERN_STATS_PATH),
+                DebugController.PATTERN_COMPLEXITY_WEIGHT,
+                DebugController.PATTERN_FREQUENCY_WEIGHT,
+                DebugController.PATTERN_SUCCESS_WEIGHT)
+        self.outcome_store = None
+        if DebugController.OUTCOME_STORE:
+            self.outcome_store = OutcomeStore(DebugController.OUTCOME_STORE_PATH,
+                DebugController.OUTCOME_STORE_MAX_ENTRIES)
+            self.test_suite_hash = OutcomeStore.hash_test_suite(test_suite)
         DebugController.QT_QUEUE.enqueue(self.abduction_breadth, self.abduction_depth)
     
     def start_auto_debugging(self, model_src_code = None,
@@ -65,9 +95,11 @@ class AbinModel():
         behavior = Behavior.Undefined
         prev_observation = []
         influence_path = []
+        baseline = None
         with localizator:
             (prev_observation, influence_path) = localizator.model_testing(check_consistency=False)
             model_src_code = localizator.model_src
+            baseline = localizator.get_baseline()
             if localizator.are_all_test_pass():
                 behavior = Behavior.Valid
         AbinLogging.debugging_logger.info(f"""
@@ -86,7 +118,11 @@ class AbinModel():
         while True:
             new_observation = []
             hypotheses_generator = self.hypotheses_generation(influence_path, model_src_code[:], self.max_complexity)
-            
+            if DebugController.BACKGROUND_HYPOTHESES_PRODUCER:
+                # The next hypotheses are generated while the current one is tested.
+                hypotheses_generator = HypothesisProducer(hypotheses_generator,
+                    DebugController.HYPOTHESES_QUEUE_SIZE)
+
             with hypotheses_generator:
                 for hypothesis in hypotheses_generator:
                     AbinLogging.debugging_logger.info(f"""
@@ -96,7 +132,7 @@ class AbinModel():
                     )
                     self.abduction_breadth += 1
                     DebugController.QT_QUEUE.enqueue(self.abduction_breadth, self.abduction_depth)
-                    (new_model_src_code, behavior, new_observation, hypothesis) = self.hyphotesis_testing(prev_observation, model_src_code[:], hypothesis)
+                    (new_model_src_code, behavior, new_observation, hypothesis) = self.hyphotesis_testing(prev_observation, model_src_code[:], hypothesis, baseline)
                     AbinLogging.debugging_logger.info(f""" 
                         New Observations:
                         {new_observation}
@@ -121,6 +157,7 @@ class AbinModel():
                             pass
                     
                     if behavior == Behavior.Correct:
+                        hypotheses_generator.record_repair()
                         break
             
             if behavior == Behavior.Correct:
@@ -167,6 +204,7 @@ class AbinModel():
                 with localizator:
                     (prev_observation, influence_path) = localizator.model_testing(check_consistency=False)
                     model_src_code = localizator.model_src
+                    baseline = localizator.get_baseline()
             else:
                 break
                 
@@ -184,7 +222,8 @@ class AbinModel():
             localizator = self.fault_localizator(model_path = self.bugged_file_path,
                 target_function = self.function_name, 
                 test_suite = self.test_suite,
-                schema=self.abduction_schema)
+                schema=self.abduction_schema,
+                comparator=self.output_comparator)
         else:
             AbinLogging.debugging_logger.debug(f"Improvement Candidates: {improvement_candidates_set}\n")
             AbinLogging.debugging_logger.debug(f"New Model: {model_src_code}")
@@ -192,7 +231,8 @@ class AbinModel():
                 improvement_candidates_set = improvement_candidates_set, 
                 target_function = self.function_name,
                 test_suite = self.test_suite,
-                schema=self.abduction_schema)
+                schema=self.abduction_schema,
+                comparator=self.output_comparator)
         return localizator
 
     def hypotheses_generation(self, 
@@ -207,34 +247,101 @@ class AbinModel():
         :type  max_complexity: int
         :rtype : Tuple[Behavior, Observation]
         """
-        return self.hypotheses_generator(influence_path, src_code, max_complexity)
+        return self.hypotheses_generator(influence_path, src_code, max_complexity,
+            pattern_cache=self.pattern_cache, pattern_scheduler=self.pattern_scheduler,
+            fix_template_cache=self.fix_template_cache)
 
     def hyphotesis_testing(self, 
         prev_observation: Observation, 
         src_code: Union[List[str], str],
-        hypothesis: Hypothesis) -> Tuple[Behavior, Observation]:
+        hypothesis: Hypothesis,
+        baseline: TestBaseline = None) -> Tuple[Behavior, Observation]:
         """ This method encapsulates the hypothesis testing process.
         
         :param prev_observation: The previous observation.
         :type  prev_observation: Observation
         :param model_name: The model's name.
         :type  model_name: str
+        :param baseline: The outcomes and coverage observed in the model without the hypothesis.
+        :type  baseline: TestBaseline
         :rtype : Tuple[Behavior, Observation]
         """
         behavior = Behavior.Undefined
         observation = []
         influence_path = []
         new_model_src_code = []
+        outcome_key = None
+        # The outcome is not persisted unless the hypothesis was completely tested.
+        is_complete = False
+        if self.outcome_store is not None:
+            new_model_src = ModelConstructor().build_hypothesis_model(hypothesis, src_code[:])
+            outcome_key = self.get_outcome_key(new_model_src, prev_observation, baseline)
+            stored_outcome = self.outcome_store.get(outcome_key)
+            if stored_outcome is not None:
+                (behavior_name, observation, explanatory_power) = stored_outcome
+                AbinLogging.debugging_logger.info(f"Hypothesis outcome found in the outcome store.")
+                hypothesis = (*hypothesis[:2], explanatory_power)
+                return (new_model_src.splitlines(), Behavior[behavior_name], observation, hypothesis)
         with self.hyphotesis_tester(prev_observation, src_code,
-            self.function_name, self.test_suite, hypothesis) as hypo_test:
+            self.function_name, self.test_suite, hypothesis,
+            comparator=self.output_comparator, baseline=baseline,
+            scheduler=self.test_scheduler) as hypo_test:
             (observation, influence_path) = hypo_test.model_testing(check_consistency=True)
             behavior = hypo_test.compare_observations()
             new_model_src_code = hypo_test.model_src
             hypothesis = hypo_test.hypothesis
+            is_complete = hypo_test.is_complete
+        # An outcome decided by a timeout, a budget or the test order depends on the run, it is not persisted.
+        if outcome_key is not None and is_complete:
+            self.outcome_store.put(outcome_key, behavior.name, observation, hypothesis[2])
         return (new_model_src_code, behavior, observation, hypothesis)
 
+    def get_outcome_key(self, model_src_code: str, prev_observation: Observation,
+        baseline: TestBaseline = None) -> StoreKey:
+        """ This method returns the outcome store key of a hypothesis model.
+
+        The testing policy covers the settings that decide a test outcome
+        and the observations the hypothesis' observation depends on.
+        The test order is not covered, only the outcomes of the runs
+        that executed every selected test case are stored.
+
+        :param model_src_code: The source code of the hypothesis model.
+        :type  model_src_code: str
+        :param prev_observation: The previous observation.
+        :type  prev_observation: Observation
+        :param baseline: The outcomes and coverage observed in the model without the hypothesis.
+        :type  baseline: TestBaseline
+        :rtype: StoreKey
+        """
+        get_outcomes = lambda observation: [test_result[1] == PassedTest for test_result in observation]
+        baseline_outcomes = None
+        if baseline is not None and DebugController.TEST_IMPACT_SELECTION:
+            baseline_outcomes = get_outcomes(baseline.observation)
+        policy_hash = OutcomeStore.hash_policy(
+            self.function_name,
+            DebugController.TEST_TIMEOUT,
+            DebugController.ADAPTIVE_TEST_TIMEOUT,
+            DebugController.TEST_TIMEOUT_MULTIPLIER,
+            DebugController.MINIMUM_TEST_TIMEOUT,
+            DebugController.EXECUTION_BUDGET_MODE,
+            DebugController.STEP_BUDGET_MULTIPLIER,
+            DebugController.MINIMUM_STEP_BUDGET,
+            DebugController.HYPOTHESIS_SCREENING,
+            DebugController.MODULE_SNAPSHOT_MODE,
+            DebugController.ISOLATED_EXECUTION,
+            get_outcomes(prev_observation),
+            baseline_outcomes
+        )
+        return (OutcomeStore.hash_model(model_src_code), self.test_suite_hash, policy_hash)
+
     def hyphotesis_refinement(self):
         pass
+
+    def close(self) -> None:
+        """ This method releases the resources kept during the debugging session (e.g. the outcome store). """
+        if self.outcome_store is not None:
+            self.outcome_store.close()
+            self.outcome_store = None
     
     def __enter__(self):
         """ Context manager method """
@@ -252,6 +359,7 @@ class AbinModel():
         :type  exc_traceback: TracebackType
         :rtype: bool
         """
+        self.close()
         if exc_tp is not None:
             AbinLogging.debugging_logger.warning(f"""
                 An error ocurred during in the model execution.
@@ -307,8 +415,8 @@ def main():
     (parsed_data, parsed_types) = parse_csv_data(df)
     test_cases = parsed_data
     
-    abin = AbinModel(func_name, path_bugged_file, test_cases)
-    (model_name, behavior, prev_observation, new_observation) = abin.start_auto_debugging()
+    with AbinModel(func_name, path_bugged_file, test_cases) as abin:
+        (model_name, behavior, prev_observation, new_observation) = abin.start_auto_debugging()
 
 def debugger_is_active() -> bool:
     """ This method return if the debugger is currently active """
@@ -348,6 +348,8 @@ class AbinView(QMainWindow):
         txtReposCollection = self.miningPage.findChild(QLineEdit, 'txtReposCollection')
         txtReposCollection.setText(config_data['MINING_DB_REPO_COLLECTION'])
         # Setting Page
+        if self.configTable.rowCount() < len(config_data):
+            self.configTable.setRowCount(len(config_data))
         for i, (key, value) in enumerate(config_data.items()):
             qItemCol = QTableWidgetItem(key)
             qItemCol.setFlags(qItemCol.flags() ^ Qt.ItemIsEditable)
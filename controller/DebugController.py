@@ -23,6 +23,114 @@ DB_STATUS = ConnectionStatus.Undefined
 
 TEST_TIMEOUT: int = int(1)
 
+# Run only the test cases that executed the line changed by a hypothesis.
+TEST_IMPACT_SELECTION: bool = True
+
+# Derive the hypotheses' test timeouts from the baseline wall time of each test case,
+# the adaptive timeout is bounded by MINIMUM_TEST_TIMEOUT and TEST_TIMEOUT. The test cases
+# that failed in the baseline may have stopped early, they get the slowest passed test's time.
+ADAPTIVE_TEST_TIMEOUT: bool = True
+TEST_TIMEOUT_MULTIPLIER: float = 10.0
+MINIMUM_TEST_TIMEOUT: float = 0.05
+
+# Instrument the models' loops and functions with a step counter calibrated from
+# the baseline run, a test case fails deterministically once it runs out of steps.
+# The test cases that failed in the baseline get the steps of the most expensive passed one.
+EXECUTION_BUDGET_MODE: bool = False
+STEP_BUDGET_MULTIPLIER: float = 10.0
+MINIMUM_STEP_BUDGET: int = 1000
+
+# Persist the outcome of the tested hypotheses across sessions, the outcomes are
+# addressed by the hypothesis model, the test suite and the testing policy.
+OUTCOME_STORE: bool = True
+OUTCOME_STORE_PATH: Path = WORKING_DIR.joinpath('outcomes.sqlite3')
+OUTCOME_STORE_MAX_ENTRIES: int = 100000
+
+# Execute the module-level code of a model once and snapshot its globals, the hypotheses
+# that change a top-level function only execute that function over the restored globals.
+MODULE_SNAPSHOT_MODE: bool = False
+# Remove the module-level expression statements (e.g. prints) while parsing a model.
+STRIP_MODULE_EXPRESSIONS: bool = False
+
+# Test a hypothesis against the previously failing test cases first,
+# the hypotheses that do not pass any of them are not tested any further.
+HYPOTHESIS_SCREENING: bool = True
+
+# Test the hypotheses in a forked worker with resource limits, a worker that exceeds
+# them labels all its test cases as failed. The memory limit (in MB) is added
+# to the memory inherited from the debugging process, the CPU limit is in seconds.
+ISOLATED_EXECUTION: bool = False
+HYPOTHESIS_MEMORY_LIMIT: int = 512
+HYPOTHESIS_CPU_LIMIT: int = 30
+
+# Query the local pattern index (exported with model/misc/pattern_index.py)
+# instead of the MongoDB server, no database connection is needed.
+OFFLINE_PATTERN_INDEX: bool = False
+PATTERN_INDEX_PATH: Path = MAIN_DIR.joinpath('patterns.sqlite3')
+
+# Query the materialized pattern groups (maintained while mining, rebuilt with
+# model/misc/pattern_groups.py) instead of grouping the raw bug-fixes. The raw
+# bug-fixes are still grouped when the groups' collection is missing or empty.
+MATERIALIZED_PATTERN_GROUPS: bool = True
+
+# The number of upcoming bug candidates whose patterns are fetched in the background
+# with a single query while the current candidate is tested, 0 disables the prefetch.
+PATTERN_PREFETCH_WINDOW: int = 8
+
+# The number of pattern query results kept during a debugging session, 0 disables the cache.
+PATTERN_CACHE_CAPACITY: int = 256
+
+# The maximum number of available identifiers per node type retrieved with each pattern,
+# the identifiers of a commit are mostly foreign to the model. 0 retrieves all of them.
+# A cap keeps the first identifiers in mining order, thus it may change the hypotheses;
+# it is applied when querying, the pattern groups and the pattern index keep all of them.
+PATTERN_IDENTIFIERS_LIMIT: int = 0
+
+# Order the matching patterns of a bug candidate by a score that combines their complexity,
+# their frequency in the wild (count_similar) and their persisted repair success rate,
+# instead of only by complexity.
+PATTERN_SCHEDULING: bool = True
+PATTERN_STATS_PATH: Path = WORKING_DIR.joinpath('pattern_stats.sqlite3')
+PATTERN_COMPLEXITY_WEIGHT: float = 1.0
+PATTERN_FREQUENCY_WEIGHT: float = 0.25
+PATTERN_SUCCESS_WEIGHT: float = 1.0
+
+# The hypothesis models are built in memory, write each tested model to
+# MODEL_DUMP_DIR to inspect them (it slows down the repair).
+DUMP_HYPOTHESIS_MODELS: bool = False
+MODEL_DUMP_DIR: Path = WORKING_DIR.joinpath('models')
+
+# Skip the hypotheses that rewrite their line with the same code or that were already
+# generated for the same line of the model. The seen hypotheses are kept in a set,
+# or in a Bloom filter sized for HYPOTHESIS_BLOOM_CAPACITY hypotheses if it is above 0
+# (a false positive skips an untested hypothesis with HYPOTHESIS_BLOOM_ERROR_RATE probability).
+HYPOTHESIS_DEDUPLICATION: bool = True
+HYPOTHESIS_BLOOM_CAPACITY: int = 0
+HYPOTHESIS_BLOOM_ERROR_RATE: float = 0.001
+
+# Reject the hypotheses that do not compile or that load names not bound in their scope,
+# before their models are loaded. The rejections are counted per reason.
+HYPOTHESIS_PREVALIDATION: bool = True
+
+# Generate the hypotheses in a background thread that stays up to HYPOTHESES_QUEUE_SIZE
+# hypotheses ahead of the tester. The thread competes with the tests for the interpreter,
+# which may trip the tight test timeouts, thus it is disabled by default.
+BACKGROUND_HYPOTHESES_PRODUCER: bool = False
+HYPOTHESES_QUEUE_SIZE: int = 16
+
+# Fill up the patterns only with the identifiers visible from the bug candidate's scope
+# (its locals, the enclosing functions' locals, the globals and the built-ins), the names
+# of a pattern are kept only if they are visible too. Each pattern yields at most
+# MAX_HYPOTHESES_PER_PATTERN hypotheses, 0 does not limit them.
+SCOPE_IDENTIFIER_PRUNING: bool = True
+MAX_HYPOTHESES_PER_PATTERN: int = 1000
+
+# Compile each fix-pattern once into a source template, so its hypotheses are rendered
+# by filling up the identifiers' slots instead of rebuilding and unparsing its AST.
+# The last FIX_TEMPLATE_CACHE_CAPACITY templates are kept during a debugging session.
+COMPILED_FIX_TEMPLATES: bool = True
+FIX_TEMPLATE_CACHE_CAPACITY: int = 1024
+
 from controller.pyqtSignalQueue import pyqtSignalQueueHandler
 QT_QUEUE = pyqtSignalQueueHandler()
 
@@ -6,10 +6,9 @@ Also, it is one of the core modules used in the methodology.
 """
 from model.abstractor.NodeMapper import ASTNode
 from model.core.ModelTester import ModelTester, TestSuite
+from model.core.OutputComparator import OutputComparator
 from model.HypothesisRefinement import HypothesisRefinement, ImprovementCadidates, AbductionSchema
 from typing import Union, List
-from pathlib import Path
-from shutil import rmtree as remove_dir
 import ast
 import astunparse
 import re
@@ -27,7 +26,8 @@ class FaultLocalizator(ModelTester, HypothesisRefinement):
         model_path: str = '', src_code: Union[List[str], str] = [],
         susp_threshold: int = 0,
         improvement_candidates_set: ImprovementCadidates = None,
-        schema: AbductionSchema = AbductionSchema.DFS) -> None:
+        schema: AbductionSchema = AbductionSchema.DFS,
+        comparator: OutputComparator = None) -> None:
         """ Constructor Method """
         AbinLogging.debugging_logger.debug('Init FaultLocalizator')
         if improvement_candidates_set is None:
@@ -39,13 +39,14 @@ class FaultLocalizator(ModelTester, HypothesisRefinement):
             HypothesisRefinement.__init__(self, improvement_candidates_set=improvement_candidates_set, schema=schema)
             hypothesis = self.select_imprv_candidate()
             new_model_code = self.build_hypothesis_model(hypothesis, src_code[:]) 
-        self._init_ModelTester(new_model_code, target_function, test_suite, susp_threshold)
+        self._init_ModelTester(new_model_code, target_function, test_suite, susp_threshold, comparator)
     
     def _init_ModelTester(self, 
                 src_code: Union[List[str], str],
                 target_function: str, 
                 test_suite: TestSuite,
-                susp_threshold: int = 0) -> None:
+                susp_threshold: int = 0,
+                comparator: OutputComparator = None) -> None:
         """ This private method initializes the superclass ModelTester.
         :param src_code: The source code of the model.
         :type  src_code: Union[List[str], str]
@@ -55,12 +56,15 @@ class FaultLocalizator(ModelTester, HypothesisRefinement):
         :type  test_suite: TestSuite
         :param susp_threshold: The suspiciousness threshold value.
         :type  susp_threshold: int
+        :param comparator: The comparator of the test suite's expected outputs.
+        :type  comparator: OutputComparator
         """
         ModelTester.__init__(self, 
             src_code=src_code, 
             target_function=target_function, 
             test_suite=test_suite,
-            susp_threshold=susp_threshold)
+            susp_threshold=susp_threshold,
+            comparator=comparator)
 
     def __iter__(self) -> None:
         """ Class Iterator Constructor """
@@ -78,21 +82,11 @@ class FaultLocalizator(ModelTester, HypothesisRefinement):
         hypothesis = self.select_imprv_candidate()
         if hypothesis is not None:
             new_model_code = self.build_hypothesis_model(hypothesis, self.model_src)
-            self._init_ModelTester(new_model_code, self.target_function, self.test_suite)
+            self._init_ModelTester(new_model_code, self.target_function, self.test_suite,
+                comparator=self.comparator)
             return True
         return False
 
-    @staticmethod
-    def clean_temporal_files(curr_dir: Path) -> None:
-        """ This method cleans up the temporal files folder.
-        :param curr_dir: The path object to the temporal foler.
-        :type  curr_dir: Path
-        """
-        with curr_dir.joinpath('temp') as temp_dir:
-            if temp_dir.exists():
-                remove_dir(temp_dir)
-            temp_dir.mkdir(exist_ok=True)
-
     def prepare_model(self, path) -> str:
         """ This method prepares the provided model/program.
 
@@ -105,21 +99,25 @@ class FaultLocalizator(ModelTester, HypothesisRefinement):
         except Exception:
             AbinLogging.debugging_logger.exception(f'Unable to open the file at the given path {path}.')
         else:
-            parsed_model = self.parse_model(src)
+            parsed_model = self.parse_model(src, DebugController.STRIP_MODULE_EXPRESSIONS)
             parsed_source = astunparse.unparse(parsed_model)
             parsed_source = re.sub('^\n+', '', parsed_source) # Remove new lines at the start of the src code
         finally:
             return parsed_source
 
     @staticmethod
-    def parse_model(src: str) -> ASTNode:
+    def parse_model(src: str, strip_module_expressions: bool = False) -> ASTNode:
         """This method refactors the model for the debugging process.
         
         This method removes unnecessary elements like docstrings, comment lines,
         and refactors multiple-lines statements into one-line statements per statement.
+        Optionally, the module-level expression statements (e.g. `print(f(3))`)
+        are removed, since they are side effects executed with every model.
         
         :param src: The models' source code to be parsed.
         :type  src: str
+        :param strip_module_expressions: Remove the module-level expression statements.
+        :type  strip_module_expressions: bool
         :rtype: ASTNode
         """
         try:
@@ -137,5 +135,7 @@ class FaultLocalizator(ModelTester, HypothesisRefinement):
                 if not hasattr(node.body[0], 'value') or not isinstance(node.body[0].value, ast.Str):
                     continue
                 node.body = node.body[1:]
+            if strip_module_expressions:
+                parsed.body = [node for node in parsed.body if not isinstance(node, ast.Expr)]
         finally:
             return parsed
\ No newline at end of file
@@ -7,10 +7,20 @@ The ModelConstructor class is in charge of constructing
 a proper model for an hypothesis.
 The Behaviour class is an enumeration of the available behaviors.
 """
-from model.core.ModelTester import ModelTester, TestSuite, Observation, PassedTest, FailedTest
+from model.core.ModelTester import ModelTester, TestSuite, Observation, PassedTest, FailedTest, TestBaseline
+from model.core.AbinDebugger import InfluencePath
+from model.core.ExecutionBudget import BudgetInstrumenter
+from model.core.IsolatedWorker import IsolatedWorker, WorkerCrashed
+from model.core.OutputComparator import OutputComparator
+from model.core.TestScheduler import TestScheduler
 from model.HypothesisGenerator import Hypothesis
-from typing import Union, List
+from pathlib import Path
+from types import CodeType
+from typing import Any, Dict, Union, List, Set, Tuple
 import controller.AbinLogging as AbinLogging
+import controller.DebugController as DebugController
+import ast
+import hashlib
 import re
 
 from enum import Enum
@@ -46,21 +56,254 @@ class ModelConstructor():
         new_model_src[position - 1] = hypothesis_str
 
         return '\n'.join(new_model_src)
+
+    def dump_hypothesis_model(self, hypothesis: Hypothesis, model_src: str) -> Path:
+        """ This method writes a hypothesis model to the dump folder, for debugging purposes.
+
+        The models are only kept in memory during the repair, the file is
+        named after the hypothesis' position and the hash of the model.
+
+        :param hypothesis: The hypothesis of the model.
+        :type  hypothesis: Hypothesis
+        :param model_src: The source code of the hypothesis model.
+        :type  model_src: str
+        :rtype: Path
+        """
+        model_hash = hashlib.sha1(model_src.encode('utf-8')).hexdigest()[:12]
+        dump_path = DebugController.MODEL_DUMP_DIR.joinpath(f"model_{hypothesis[1]}_{model_hash}.py")
+        try:
+            DebugController.MODEL_DUMP_DIR.mkdir(parents=True, exist_ok=True)
+            dump_path.write_text(model_src)
+        except OSError:
+            AbinLogging.debugging_logger.exception(f"Unable to dump the model {dump_path.name}.")
+        return dump_path
+
 class HyphotesisTester(ModelTester, ModelConstructor):
     """ This class' goal is to test a hypothesis.
     It inherits from ModelTester and ModelConstructor. """
     prev_observation: Observation
     hypothesis: Hypothesis
+    is_screened_out: bool
+    # The hypotheses' models are not used as a baseline, their globals are not saved.
+    TAKES_SNAPSHOT: bool = False
+    # The attributes changed by a model test that are sent back by the isolated worker.
+    ISOLATED_STATE = ('observation', 'influence_path', 'is_screened_out',
+                      'coverage_index', 'test_durations', 'test_steps', 'interrupted_tests',
+                      'is_stopped_early')
     def __init__(self, prev_observation: Observation, 
         src_code: Union[List[str], str], target_function: str, 
-        test_suite: TestSuite, hypothesis: Hypothesis) -> None:
+        test_suite: TestSuite, hypothesis: Hypothesis,
+        comparator: OutputComparator = None,
+        baseline: TestBaseline = None,
+        scheduler: TestScheduler = None) -> None:
         """ Constructor Method """
         AbinLogging.debugging_logger.debug('Init HyphotesisTester')
 
         new_model_code = self.build_hypothesis_model(hypothesis, src_code)
-        super().__init__(new_model_code, target_function, test_suite)
+        if DebugController.DUMP_HYPOTHESIS_MODELS:
+            self.dump_hypothesis_model(hypothesis, new_model_code)
+        super().__init__(new_model_code, target_function, test_suite, comparator=comparator)
         self.hypothesis = hypothesis
         self.prev_observation = prev_observation
+        self.baseline = baseline
+        self.scheduler = scheduler
+        self.is_screened_out = False
+
+    def model_testing(self, check_consistency: bool = False,
+        test_case_ids: Union[Set[int], None] = None) -> Tuple[Observation, InfluencePath]:
+        """ This method, returns an observation of the executed test cases and an influence path.
+
+        In the isolated execution mode, the hypothesis is tested in a forked worker
+        under memory and CPU limits. If the worker dies (e.g. it exceeds a limit),
+        all the test cases are labeled as failed instead of crashing the session.
+
+        :param check_consistency: A control variable to enter
+        to the check_result_consistency method.
+        :type  check_consistency: bool
+        :param test_case_ids: The test cases to be executed, None means all of them.
+        :type  test_case_ids: Union[Set[int], None]
+        :rtype: Tuple[Observation, InfluencePath]
+        """
+        if not DebugController.ISOLATED_EXECUTION or test_case_ids is not None:
+            return self.screened_model_testing(check_consistency, test_case_ids)
+        worker = IsolatedWorker(DebugController.HYPOTHESIS_MEMORY_LIMIT * 2**20,
+            DebugController.HYPOTHESIS_CPU_LIMIT)
+        try:
+            isolated_state = worker.run(self.get_isolated_state, check_consistency)
+        except WorkerCrashed as e:
+            AbinLogging.debugging_logger.warning(f"Hypothesis testing aborted: {e}")
+            self.observation = [('UndefinedTest', FailedTest) for i in range(len(self.test_suite))]
+            self.influence_path = []
+            # The worker may have been killed by a resource limit.
+            self.interrupted_tests = set(range(len(self.test_suite)))
+        else:
+            self.set_isolated_state(isolated_state)
+        return (self.observation, self.influence_path)
+
+    def get_isolated_state(self, check_consistency: bool) -> Dict[str, Any]:
+        """ This method tests the hypothesis and returns the resulting state.
+
+        This method is executed in the isolated worker, thus the state
+        changed by the test (including the scheduler's statistics) is returned.
+
+        :param check_consistency: A control variable to enter
+        to the check_result_consistency method.
+        :type  check_consistency: bool
+        :rtype: Dict[str, Any]
+        """
+        self.screened_model_testing(check_consistency)
+        isolated_state = {attr: getattr(self, attr) for attr in self.ISOLATED_STATE}
+        if self.scheduler is not None:
+            isolated_state['scheduler'] = vars(self.scheduler)
+        return isolated_state
+
+    def set_isolated_state(self, isolated_state: Dict[str, Any]) -> None:
+        """ This method updates the tester with the state returned by the isolated worker.
+
+        :param isolated_state: The state returned by get_isolated_state.
+        :type  isolated_state: Dict[str, Any]
+        """
+        for attr in self.ISOLATED_STATE:
+            setattr(self, attr, isolated_state[attr])
+        if self.scheduler is not None:
+            vars(self.scheduler).update(isolated_state['scheduler'])
+
+    def screened_model_testing(self, check_consistency: bool = False,
+        test_case_ids: Union[Set[int], None] = None) -> Tuple[Observation, InfluencePath]:
+        """ This method, returns an observation of the executed test cases and an influence path.
+
+        The hypothesis is tested in two stages. First, only the test cases
+        that failed in the previous observation are executed; a hypothesis
+        that makes none of them pass cannot improve the explanatory power,
+        thus it is screened out. The survivors are tested against the
+        rest of the test suite, the screened test cases are not executed again.
+        The observation of a screened out hypothesis keeps the previous
+        outcome of the test cases that were not executed.
+
+        :param check_consistency: A control variable to enter
+        to the check_result_consistency method.
+        :type  check_consistency: bool
+        :param test_case_ids: The test cases to be executed, None means all of them.
+        :type  test_case_ids: Union[Set[int], None]
+        :rtype: Tuple[Observation, InfluencePath]
+        """
+        if (not DebugController.HYPOTHESIS_SCREENING or test_case_ids is not None
+            or not self.prev_observation):
+            return super().model_testing(check_consistency, test_case_ids)
+        failing_tests = {i for i, test_result in enumerate(self.prev_observation)
+                        if test_result[1] == FailedTest}
+        if not failing_tests:
+            return super().model_testing(check_consistency)
+        (observation, influence_path) = super().model_testing(check_consistency, failing_tests)
+        if not any(observation[i][1] == PassedTest for i in failing_tests):
+            AbinLogging.debugging_logger.info(f"Hypothesis screened out, no failing test case passed.")
+            self.is_screened_out = True
+            self.observation = [self.prev_observation[i] if test_result[0] == 'UndefinedTest' else test_result
+                                for i, test_result in enumerate(observation)]
+            return (self.observation, influence_path)
+        regression_tests = set(range(len(self.test_suite))) - failing_tests
+        return super().model_testing(check_consistency, regression_tests)
+
+    def get_test_timeout(self, test_case_id: int) -> float:
+        """ This method returns the timeout (in seconds) of a test case.
+
+        The timeout is derived from the test case's wall time in the baseline
+        model, i.e., a multiple of the baseline time bounded by a floor and
+        by the global timeout, in order to cut off non-terminating hypotheses early.
+        A test case that failed in the baseline may have stopped early
+        (e.g. on an exception), thus it is bounded by the slowest passed test case.
+
+        :param test_case_id: Current test case identifier.
+        :type  test_case_id: int
+        :rtype: float
+        """
+        test_timeout = super().get_test_timeout(test_case_id)
+        if not DebugController.ADAPTIVE_TEST_TIMEOUT or self.baseline is None:
+            return test_timeout
+        if self.budget is not None:
+            # The execution budget replaces the adaptive timeout,
+            # the global timeout is kept as a safety net.
+            return test_timeout
+        baseline_time = self.baseline.get_reference(self.baseline.durations,
+            self.baseline.max_duration, test_case_id)
+        if baseline_time is None:
+            return test_timeout
+        adaptive_timeout = baseline_time * DebugController.TEST_TIMEOUT_MULTIPLIER
+        adaptive_timeout = max(adaptive_timeout, DebugController.MINIMUM_TEST_TIMEOUT)
+        return min(adaptive_timeout, test_timeout)
+
+    def get_step_budget(self, test_case_id: int) -> Union[int, None]:
+        """ This method returns the execution steps available to a test case.
+
+        The budget is calibrated from the steps the test case used in the
+        baseline model, thus a runaway hypothesis is stopped deterministically.
+        A test case that failed in the baseline may have stopped early,
+        thus it is calibrated from the passed test case that used the most steps.
+
+        :param test_case_id: Current test case identifier.
+        :type  test_case_id: int
+        :rtype: Union[int, None]
+        """
+        if self.baseline is None:
+            return None
+        baseline_steps = self.baseline.get_reference(self.baseline.steps,
+            self.baseline.max_steps, test_case_id)
+        if baseline_steps is None:
+            return None
+        step_budget = baseline_steps * DebugController.STEP_BUDGET_MULTIPLIER
+        return max(int(step_budget), DebugController.MINIMUM_STEP_BUDGET)
+
+    def get_snapshot_patch(self) -> Union[CodeType, None]:
+        """ This method returns the code to execute on top of the baseline's snapshot.
+
+        If the hypothesis changes a line inside a (non-decorated) top-level function,
+        only that function definition is executed on top of the globals saved from
+        the baseline model; otherwise, the whole model must be executed.
+
+        :rtype: Union[CodeType, None]
+        """
+        if not DebugController.MODULE_SNAPSHOT_MODE:
+            return None
+        if self.baseline is None or self.baseline.snapshot is None:
+            return None
+        try:
+            tree = ast.parse(self.src_code)
+        except SyntaxError:
+            return None
+        line_no = self.hypothesis[1]
+        for node in tree.body:
+            if node.lineno <= line_no <= node.end_lineno:
+                break
+        else:
+            return None
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) or node.decorator_list:
+            return None
+        patch = ast.Module(body=[node], type_ignores=[])
+        if self.budget is not None:
+            patch = BudgetInstrumenter().instrument(patch)
+        return compile(patch, self.fullname, 'exec', dont_inherit=True)
+
+    def get_impacted_tests(self) -> Union[Set[int], None]:
+        """ This method returns the test cases that may be affected by the hypothesis.
+
+        A hypothesis only changes the line at `hypothesis[1]`, thus the
+        test cases that did not execute that line in the baseline model
+        keep their baseline outcome and are not executed again.
+        None means that the whole test suite must be executed.
+
+        :rtype: Union[Set[int], None]
+        """
+        if not DebugController.TEST_IMPACT_SELECTION or self.baseline is None:
+            return None
+        if self.func is None:
+            # The model failed to load, every test case is affected.
+            return None
+        impacted_tests = self.baseline.get_covering_tests(self.hypothesis[1])
+        if impacted_tests is not None:
+            AbinLogging.debugging_logger.info(
+                f"Test cases affected by the hypothesis: {len(impacted_tests)} of {len(self.test_suite)}"
+            )
+        return impacted_tests
 
     def compare_observations(self) -> Behavior:
         """ This method compares two observations.
@@ -71,6 +314,10 @@ class HyphotesisTester(ModelTester, ModelConstructor):
 
         :type: Behavior
         """
+        if self.is_screened_out:
+            # The hypothesis did not pass any of the failing test cases.
+            self.hypothesis = (*self.hypothesis[:2], self.get_explanatory_power(self.observation))
+            return Behavior.Same
         if self.is_consistent:
             prev_explanatory_power = self.get_explanatory_power(self.prev_observation)
             AbinLogging.debugging_logger.info(f'Previous Explanatory Power: {prev_explanatory_power}')
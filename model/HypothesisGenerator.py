@@ -1,25 +1,245 @@
 """
-This module contains the HypothesisGenerator class.
-This class is in charge of generating new hypotheses to repair a defect.
+This module contains the HypothesisGenerator, PatternCursor, PatternPrefetcher
+and PatternScheduler classes.
+The HypothesisGenerator class is in charge of generating new hypotheses to repair a defect.
 Also,it is one of the core modules used in the methodology.
+The PatternCursor class is in charge of streaming the matching patterns
+retrieved from the database.
+The PatternPrefetcher class is in charge of retrieving the matching patterns
+of the upcoming bug candidates in the background.
+The PatternScheduler class is in charge of deciding which matching pattern
+of a bug candidate is applied first.
 """
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
-from pathlib import Path
-from typing import List, Iterator, Tuple, Union, Type, Optional
+from io import StringIO
+from itertools import islice
+from math import log1p
+from typing import Any, Callable, Deque, Dict, Iterable, List, Iterator, Set, Tuple, Union, Type, Optional
+from threading import Lock
 from types import TracebackType
 from model.abstractor.NodeAbstractor import NodeAbstractor, NodeAbstraction
 from model.abstractor.PythonLLOC import PythonLLOC
-from model.abstractor.HypothesisAbductor import HypothesisAbductor
+from model.abstractor.ModelIndex import ModelIndex
+from model.abstractor.HypothesisAbductor import HypothesisAbductor, FixTemplate
 from model.abstractor.NodeMapper import ASTNode, IDTokens
+from model.core.BloomFilter import BloomFilter
+from model.core.HypothesisValidator import HypothesisValidator
+from model.core.PatternCache import PatternCache
+from model.core.PatternStats import PatternStats
 import controller.AbinLogging as AbinLogging
 import controller.DebugController as DebugController
 import re
-from pymongo import MongoClient
+import tokenize
+import hashlib
+from pymongo.collection import Collection
+from pymongo.database import Database
+import model.misc.db_client_manager as db_client_manager
+import model.misc.pattern_index as pattern_index
+import model.misc.pattern_groups as pattern_groups
 
 MatchingPattern = NodeAbstraction
 MatchingPatterns = Iterator[MatchingPattern]
 Hypothesis = Tuple[str, int, float]
 Hypotheses = List[Hypothesis]
+
+class PatternCursor():
+    """ This class streams the matching patterns of a single query.
+
+    The patterns are buffered while they are consumed, thus the cursor
+    can be iterated again (e.g. for a retry) without querying the database
+    again. The number of patterns is computed lazily, i.e., asking for it
+    consumes the remaining patterns into the buffer. Once the cursor is
+    exhausted, the buffered patterns are handed to `on_exhausted`, if any.
+    The fetching is locked, so the cursor can be iterated by several threads.
+    """
+    buffer: List[MatchingPattern]
+    is_exhausted: bool
+    on_exhausted: Union[Callable[[List[MatchingPattern]], None], None]
+
+    def __init__(self, cursor: Iterable[MatchingPattern],
+        on_exhausted: Callable[[List[MatchingPattern]], None] = None) -> None:
+        """ Constructor Method """
+        self.cursor = iter(cursor)
+        self.buffer = []
+        self.is_exhausted = False
+        self.on_exhausted = on_exhausted
+        self.lock = Lock()
+
+    def __iter__(self) -> MatchingPatterns:
+        """ This method returns an iterator from the first pattern.
+        :rtype: MatchingPatterns
+        """
+        i = 0
+        while True:
+            if i < len(self.buffer):
+                yield self.buffer[i]
+                i += 1
+            elif not self.fetch():
+                return
+
+    def __len__(self) -> int:
+        """ This method returns the number of patterns.
+        :rtype: int
+        """
+        while self.fetch():
+            pass
+        return len(self.buffer)
+
+    def fetch(self) -> bool:
+        """ This method moves the next pattern from the cursor to the buffer.
+
+        :rtype: bool
+        """
+        with self.lock:
+            if self.is_exhausted:
+                return False
+            try:
+                self.buffer.append(next(self.cursor))
+            except StopIteration:
+                self.is_exhausted = True
+                close = getattr(self.cursor, 'close', None)
+                if close is not None:
+                    close()
+                if self.on_exhausted is not None:
+                    self.on_exhausted(self.buffer)
+                return False
+            return True
+
+
+class PatternPrefetcher():
+    """ This class fetches the matching patterns of several bugs in a background thread.
+
+    The patterns of a batch of hex digests are retrieved with a single query
+    while the hypotheses of the current bug candidate are tested. The fetched
+    patterns are kept only while their hex digests are retained by the generator.
+    """
+    pending: Dict[str, Future]
+
+    def __init__(self, fetch_patterns: Callable[[List[str]], Dict[str, List[MatchingPattern]]]) -> None:
+        """ Constructor Method """
+        self.fetch_patterns = fetch_patterns
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = {}
+
+    def prefetch(self, hexdigests: List[str]) -> None:
+        """ This method starts fetching the patterns of the given hex digests.
+
+        :param hexdigests: The hex digests of the abstracted nodes.
+        :type  hexdigests: List[str]
+        """
+        hexdigests = [x for x in dict.fromkeys(hexdigests) if x not in self.pending]
+        if not hexdigests:
+            return
+        future = self.executor.submit(self.fetch_patterns, hexdigests)
+        for hexdigest in hexdigests:
+            self.pending[hexdigest] = future
+
+    def get(self, hexdigest: str) -> Union[List[MatchingPattern], None]:
+        """ This method returns the prefetched patterns of a hex digest.
+
+        It waits for the batch to be fetched, None means it was not prefetched.
+
+        :param hexdigest: The hex digest of the abstracted node.
+        :type  hexdigest: str
+        :rtype: Union[List[MatchingPattern], None]
+        """
+        future = self.pending.get(hexdigest, None)
+        if future is None:
+            return None
+        return future.result().get(hexdigest, [])
+
+    def retain(self, hexdigests: Iterable[str]) -> None:
+        """ This method releases the patterns of the hex digests that are not given.
+
+        :param hexdigests: The hex digests that may still be requested.
+        :type  hexdigests: Iterable[str]
+        """
+        hexdigests = set(hexdigests)
+        for hexdigest in list(self.pending):
+            if hexdigest not in hexdigests:
+                del self.pending[hexdigest]
+
+    def shutdown(self) -> None:
+        """ This method stops the background thread, the pending batches are cancelled. """
+        self.pending.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PatternScheduler():
+    """ This class orders the matching patterns of a bug candidate by a score.
+
+    The score rewards the patterns that are simple, frequently seen in the wild
+    (count_similar) and that repaired defects before (the persisted success rate):
+
+        score = success_weight * success_rate + frequency_weight * log(1 + count_similar)
+                - complexity_weight * complexity
+
+    The patterns with the same score keep the order of the query (by complexity).
+    """
+    complexity_weight: float
+    frequency_weight: float
+    success_weight: float
+    pattern_stats: Union[PatternStats, None]
+
+    def __init__(self, pattern_stats: PatternStats = None,
+        complexity_weight: float = 1.0, frequency_weight: float = 0.25,
+        success_weight: float = 1.0) -> None:
+        """ Constructor Method """
+        self.pattern_stats = pattern_stats
+        self.complexity_weight = complexity_weight
+        self.frequency_weight = frequency_weight
+        self.success_weight = success_weight
+
+    @staticmethod
+    def get_pattern_id(pattern: MatchingPattern) -> str:
+        """ This method returns the id of a pattern given its bug and fix hexdigests.
+
+        :param pattern: The matching pattern.
+        :type  pattern: MatchingPattern
+        :rtype: str
+        """
+        return f"{pattern['bug_metadata']['hexdigest']}:{pattern['_id']}"
+
+    def schedule(self, patterns: Iterable[MatchingPattern]) -> List[MatchingPattern]:
+        """ This method returns the patterns sorted by descending score.
+
+        :param patterns: The matching patterns of a bug candidate.
+        :type  patterns: Iterable[MatchingPattern]
+        :rtype: List[MatchingPattern]
+        """
+        patterns = list(patterns)
+        success_rates = {}
+        if self.pattern_stats is not None and self.success_weight:
+            success_rates = self.pattern_stats.get_success_rates(map(self.get_pattern_id, patterns))
+        default_rate = PatternStats.get_success_rate(0, 0)
+        def score(pattern: MatchingPattern) -> float:
+            success_rate = success_rates.get(self.get_pattern_id(pattern), default_rate)
+            return (self.success_weight * success_rate
+                + self.frequency_weight * log1p(pattern.get('count_similar', 1))
+                - self.complexity_weight * pattern['complexity'])
+        return sorted(patterns, key=score, reverse=True)
+
+    def record_attempt(self, pattern: MatchingPattern) -> None:
+        """ This method records that the hypotheses of a pattern are going to be tested.
+
+        :param pattern: The matching pattern.
+        :type  pattern: MatchingPattern
+        """
+        if self.pattern_stats is not None:
+            self.pattern_stats.record_attempt(self.get_pattern_id(pattern))
+
+    def record_success(self, pattern: MatchingPattern) -> None:
+        """ This method records that a hypothesis of a pattern repaired the defect.
+
+        :param pattern: The matching pattern.
+        :type  pattern: MatchingPattern
+        """
+        if self.pattern_stats is not None:
+            self.pattern_stats.record_success(self.get_pattern_id(pattern))
+
+
 class HypothesisGenerator():
     """ The class is utilized to generate the hypotheses set,
     which the hypotheses that may repair the bug. """
@@ -33,13 +253,30 @@ class HypothesisGenerator():
     abductor: HypothesisAbductor
     node_abstractor: NodeAbstractor
     bugged_LOC: PythonLLOC
+    model_index: ModelIndex
+    seen_hypotheses: Union[Set[str], BloomFilter, None]
+    skipped_hypotheses: int
+    hypothesis_validator: Union[HypothesisValidator, None]
+    rejected_hypotheses: Counter
     matching_patterns: MatchingPatterns
+    pattern_cursor: Union[PatternCursor, None]
+    pattern_prefetcher: Union[PatternPrefetcher, None]
+    upcoming_candidates: Deque[int]
+    candidate_hexdigests: Dict[int, str]
+    pattern_cache: Union[PatternCache, None]
+    pattern_scheduler: Union[PatternScheduler, None]
+    pattern_groups_available: Union[bool, None]
+    fix_template_cache: Union[PatternCache, None]
+    current_pattern: Union[MatchingPattern, None]
     hypotheses_set: Iterator[Hypotheses]
     max_complexity: int
     nested_node: str
 
     def __init__(self, influence_path: list,
-        model_src: Union[List[str], str], max_complexity: int = 3) -> None:
+        model_src: Union[List[str], str], max_complexity: int = 3,
+        pattern_cache: PatternCache = None,
+        pattern_scheduler: PatternScheduler = None,
+        fix_template_cache: PatternCache = None) -> None:
         """ Constructor Method """
         AbinLogging.debugging_logger.debug('Init HypothesisGenerator')
         self.abduction_depth = 0
@@ -49,6 +286,17 @@ class HypothesisGenerator():
         self.bug_candidates = map(lambda candidate: candidate[1], influence_path)
         self.model_src = model_src
         self.matching_patterns = iter([])
+        self.pattern_cursor = None
+        self.pattern_prefetcher = None
+        if DebugController.PATTERN_PREFETCH_WINDOW > 0:
+            self.pattern_prefetcher = PatternPrefetcher(self.get_batch_matching_patterns)
+        self.upcoming_candidates = deque()
+        self.candidate_hexdigests = {}
+        self.pattern_cache = pattern_cache
+        self.pattern_scheduler = pattern_scheduler
+        self.pattern_groups_available = None
+        self.fix_template_cache = fix_template_cache
+        self.current_pattern = None
         self.hypotheses_set = iter([])
         self.hypotheses_set_complexity = 0
         self.hypotheses_set_position = 0
@@ -56,12 +304,149 @@ class HypothesisGenerator():
         self.abductor = HypothesisAbductor
         self.node_abstractor = NodeAbstractor
         self.nested_node = None
+        # The model is tokenized and parsed once for all the bug candidates.
+        self.model_index = ModelIndex('\n'.join(self.model_src))
+        self.seen_hypotheses = None
+        if DebugController.HYPOTHESIS_DEDUPLICATION:
+            if DebugController.HYPOTHESIS_BLOOM_CAPACITY > 0:
+                self.seen_hypotheses = BloomFilter(DebugController.HYPOTHESIS_BLOOM_CAPACITY,
+                    DebugController.HYPOTHESIS_BLOOM_ERROR_RATE)
+            else:
+                self.seen_hypotheses = set()
+        self.skipped_hypotheses = 0
+        self.hypothesis_validator = None
+        if DebugController.HYPOTHESIS_PREVALIDATION:
+            self.hypothesis_validator = HypothesisValidator(self.model_src)
+        self.rejected_hypotheses = Counter()
 
     def get_bug_candidate(self) -> int:
         """ This method returns the next bug candidate in the iterator.
+
+        If the prefetch is enabled, the patterns of the upcoming candidates
+        are requested whenever half of the prefetch window was consumed.
         :rtype: int
         """
-        return next(self.bug_candidates)
+        if self.pattern_prefetcher is None:
+            return next(self.bug_candidates)
+        if not self.upcoming_candidates:
+            self.prefetch_patterns()
+        if not self.upcoming_candidates:
+            raise StopIteration
+        candidate = self.upcoming_candidates.popleft()
+        if len(self.upcoming_candidates) <= DebugController.PATTERN_PREFETCH_WINDOW // 2:
+            self.prefetch_patterns()
+        return candidate
+
+    def prefetch_patterns(self) -> None:
+        """ This method fills the prefetch window with the upcoming bug candidates
+        and requests their patterns in a single batch. """
+        hexdigests = []
+        while len(self.upcoming_candidates) < DebugController.PATTERN_PREFETCH_WINDOW:
+            try:
+                candidate = next(self.bug_candidates)
+            except StopIteration:
+                break
+            self.upcoming_candidates.append(candidate)
+            try:
+                hexdigest = self.get_candidate_hexdigest(candidate)
+            except Exception:
+                # The candidate will fail again (and be reported) when it is abstracted.
+                continue
+            if not self.is_cached(hexdigest):
+                hexdigests.append(hexdigest)
+        self.pattern_prefetcher.prefetch(hexdigests)
+
+    def get_candidate_hexdigest(self, candidate: int) -> str:
+        """ This method returns the hex digest of the abstracted bug candidate.
+
+        :param candidate: The line number of the bug candidate.
+        :type  candidate: int
+        :rtype: str
+        """
+        if candidate not in self.candidate_hexdigests:
+            logical_loc = self.get_logical_loc(candidate)
+            ast_bug_candidate = deepcopy(logical_loc.ast_node)
+            self.candidate_hexdigests[candidate] = self.abstract_bug_candidate(ast_bug_candidate)
+        return self.candidate_hexdigests[candidate]
+
+    def is_duplicate(self, hypothesis: str, position: int) -> bool:
+        """ This method checks if a hypothesis does not need to be tested.
+
+        A hypothesis is skipped if it rewrites its line with the same code (a no-op)
+        or if the same code was already generated for the same line of this model,
+        the code is compared without whitespaces and comments.
+
+        :param hypothesis: The hypothesis' source code.
+        :type  hypothesis: str
+        :param position: The line number of the hypothesis.
+        :type  position: int
+        :rtype: bool
+        """
+        if self.seen_hypotheses is None:
+            return False
+        normalized_hypothesis = self.normalize_code(hypothesis)
+        if normalized_hypothesis == self.normalize_code(self.model_src[position - 1]):
+            return True
+        key = f"{position}:{normalized_hypothesis}"
+        if key in self.seen_hypotheses:
+            return True
+        self.seen_hypotheses.add(key)
+        return False
+
+    @staticmethod
+    def normalize_code(code: str) -> str:
+        """ This method returns the tokens of a line of code separated by a single space.
+
+        :param code: The line of code.
+        :type  code: str
+        :rtype: str
+        """
+        ignored_tokens = (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE,
+            tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER)
+        try:
+            tokens = tokenize.generate_tokens(StringIO(code.strip()).readline)
+            return ' '.join(token.string for token in tokens if token.type not in ignored_tokens)
+        except (tokenize.TokenError, SyntaxError):
+            return ' '.join(code.split())
+
+    def get_logical_loc(self, candidate: int) -> PythonLLOC:
+        """ This method returns the logical LOC of a bug candidate, read from the model's index.
+
+        :param candidate: The line number of the bug candidate.
+        :type  candidate: int
+        :rtype: PythonLLOC
+        """
+        return self.LogicalLOC(candidate, self.model_index.source_code, self.model_index)
+
+    def get_candidate_patterns(self, ast_node_hexdigest: str) -> PatternCursor:
+        """ This method returns the matching patterns of the current bug candidate.
+
+        The cached or prefetched patterns are used if available, otherwise the database is queried.
+
+        :param ast_node_hexdigest: the hexdigest of the abstracted node.
+        :type  ast_node_hexdigest: str
+        :rtype: PatternCursor
+        """
+        if self.pattern_prefetcher is None:
+            return self.get_matching_patterns(ast_node_hexdigest)
+        matching_patterns = self.pattern_prefetcher.get(ast_node_hexdigest)
+        upcoming_hexdigests = [self.candidate_hexdigests.get(x, None) for x in self.upcoming_candidates]
+        self.pattern_prefetcher.retain(upcoming_hexdigests)
+        if matching_patterns is None:
+            return self.get_matching_patterns(ast_node_hexdigest)
+        # The prefetched patterns were already cached by get_batch_matching_patterns.
+        return PatternCursor(matching_patterns)
+
+    def is_cached(self, ast_node_hexdigest: str) -> bool:
+        """ This method checks if the patterns of a node are in the session's cache.
+
+        :param ast_node_hexdigest: the hexdigest of the abstracted node.
+        :type  ast_node_hexdigest: str
+        :rtype: bool
+        """
+        if self.pattern_cache is None:
+            return False
+        return (ast_node_hexdigest, self.max_complexity) in self.pattern_cache
 
     def abstract_bug_candidate(self, ast_bug_candidate: ASTNode) -> str:
         """ This method returns the hex digest of the abstracted node.
@@ -71,38 +456,136 @@ class HypothesisGenerator():
         hexdigest = bugged_node_abstract.ast_hexdigest
         return hexdigest
 
-    def get_matching_patterns(self, ast_node_hexdigest: str) -> Tuple[MatchingPatterns, int]:
+    def get_matching_patterns(self, ast_node_hexdigest: str) -> PatternCursor:
         """ This method queries the database to obtain a list of MatchingPatterns.
 
         The hex digest of the abstracted node is needed in the query to obtain
         all identical patterns in the database. Additionally, the query is an aggregator-type query.
+        The query is executed once, its result is streamed through a PatternCursor.
+        In the offline mode, the local pattern index is queried instead.
+        The session's cache is consulted before querying. Only the fully
+        retrieved patterns are cached (the database cursor may expire while idle),
+        thus the patterns of a query are cached once its cursor is exhausted.
 
         :param ast_node_hexdigest: the hexdigest of the abstracted node.
         :type  ast_node_hexdigest: str
-        :rtype: Tuple[MatchingPatterns, int]
+        :rtype: PatternCursor
+        """
+        cache_key = (ast_node_hexdigest, self.max_complexity)
+        if self.pattern_cache is not None:
+            matching_patterns = self.pattern_cache.get(cache_key)
+            if matching_patterns is not None:
+                return PatternCursor(matching_patterns)
+        if DebugController.OFFLINE_PATTERN_INDEX:
+            matching_patterns = pattern_index.get_matching_patterns(ast_node_hexdigest, self.max_complexity)
+            if self.pattern_cache is not None:
+                self.pattern_cache.put(cache_key, matching_patterns)
+            return PatternCursor(matching_patterns)
+        pattern_cursor = self.query_matching_patterns(ast_node_hexdigest)
+        if self.pattern_cache is not None:
+            pattern_cursor.on_exhausted = lambda matching_patterns: self.pattern_cache.put(cache_key, matching_patterns)
+        return pattern_cursor
+
+    def query_matching_patterns(self, ast_node_hexdigest: str) -> PatternCursor:
+        """ This method queries the database to obtain a list of MatchingPatterns.
+
+        :param ast_node_hexdigest: the hexdigest of the abstracted node.
+        :type  ast_node_hexdigest: str
+        :rtype: PatternCursor
+        """
+        matching_patterns = PatternCursor(self.aggregate_matching_patterns(ast_node_hexdigest))
+        return matching_patterns
+
+    def get_batch_matching_patterns(self, ast_node_hexdigests: List[str]) -> Dict[str, List[MatchingPattern]]:
+        """ This method queries the database to obtain the MatchingPatterns of several nodes.
+
+        The patterns of all the hex digests are retrieved with a single `$in` query,
+        they are grouped and sorted as in get_matching_patterns.
+
+        :param ast_node_hexdigests: the hexdigests of the abstracted nodes.
+        :type  ast_node_hexdigests: List[str]
+        :rtype: Dict[str, List[MatchingPattern]]
+        """
+        if DebugController.OFFLINE_PATTERN_INDEX:
+            batch_patterns = {hexdigest: pattern_index.get_matching_patterns(hexdigest, self.max_complexity)
+                    for hexdigest in ast_node_hexdigests}
+            self.cache_batch_patterns(batch_patterns)
+            return batch_patterns
+        batch_patterns = { hexdigest: [] for hexdigest in ast_node_hexdigests }
+        for pattern in self.aggregate_matching_patterns({ '$in': ast_node_hexdigests }):
+            batch_patterns[pattern['bug_metadata']['hexdigest']].append(pattern)
+        self.cache_batch_patterns(batch_patterns)
+        return batch_patterns
+
+    def are_pattern_groups_available(self, collection_PatternGroups: Collection) -> bool:
+        """ This method checks once if the materialized pattern groups exist and are not empty.
+
+        :param collection_PatternGroups: the instance of the pattern groups' collection.
+        :type  collection_PatternGroups: Collection
+        :rtype: bool
+        """
+        if self.pattern_groups_available is None:
+            self.pattern_groups_available = pattern_groups.has_pattern_groups(collection_PatternGroups)
+            if not self.pattern_groups_available:
+                AbinLogging.debugging_logger.warning(
+                    f"The pattern groups' collection {collection_PatternGroups.name} is missing or empty, "
+                    f"the raw bug-fixes are grouped instead (rebuild it with model/misc/pattern_groups.py)."
+                )
+        return self.pattern_groups_available
+
+    def aggregate_matching_patterns(self, bug_hexdigest: Union[str, Dict[str, Any]]) -> Iterable[MatchingPattern]:
+        """ This method executes the matching patterns' query in the database.
+
+        The materialized pattern groups are queried if they are enabled and
+        available, otherwise the raw bug-fixes are grouped by bug and fix. In both
+        cases the patterns are identified by their fix hexdigest, and only
+        the fields used by the generator are sent back.
+
+        :param bug_hexdigest: the hexdigest of the abstracted node, or a condition on it (e.g. `$in`).
+        :type  bug_hexdigest: Union[str, Dict[str, Any]]
+        :rtype: Iterable[MatchingPattern]
         """
         config = DebugController.APP_SETTINGS
         db_connection = self.mongodb_connection()
+        collection_PatternGroups = db_connection[
+            pattern_groups.get_groups_collection_name(config['DEBUG_DB_PATTERNS_COLLECTION'])]
+        if DebugController.MATERIALIZED_PATTERN_GROUPS and self.are_pattern_groups_available(collection_PatternGroups):
+            QUERY = pattern_groups.get_matching_groups_query(bug_hexdigest, self.max_complexity,
+                DebugController.PATTERN_IDENTIFIERS_LIMIT)
+            return collection_PatternGroups.aggregate(QUERY)
         collection_BugPatterns = db_connection[config['DEBUG_DB_PATTERNS_COLLECTION']]
         QUERY = [
-            { '$match': { 'bug_metadata.hexdigest': ast_node_hexdigest } },
-            { '$group': { '_id': '$fix_metadata.hexdigest',
+            # The patterns mined before the complexity was stored (complexity: null) are kept.
+            { '$match': { 'bug_metadata.hexdigest': bug_hexdigest,
+                          '$or': [ { 'complexity': { '$lte': self.max_complexity } }, { 'complexity': None } ] } },
+            { '$group': { '_id': { 'bug_hexdigest': '$bug_metadata.hexdigest',
+                                   'fix_hexdigest': '$fix_metadata.hexdigest' },
                         'fix_metadata': { '$first': '$fix_metadata' },
                         'bug_metadata': { '$first': '$bug_metadata' },
                         'available_identifiers': { '$first': '$available_identifiers' },
                         'commit_sha': { '$first': '$commit_sha' },
-                        'complexity': { '$first': { '$size': { '$objectToArray': "$fix_metadata.map_ids" } } },
+                        'complexity': { '$first': { '$ifNull': [ '$complexity',
+                                        { '$size': { '$objectToArray': "$fix_metadata.map_ids" } } ] } },
                         'count_similar': { '$sum': 1 }
                         }
             },
             { '$sort': { 'complexity': 1 } },
-            { '$match': { 'complexity': { '$lte': self.max_complexity } } }
+            { '$match': { 'complexity': { '$lte': self.max_complexity } } },
+            pattern_index.get_pattern_projection(DebugController.PATTERN_IDENTIFIERS_LIMIT),
+            { '$set': { '_id': '$_id.fix_hexdigest' } }
         ]
-        matching_patterns = collection_BugPatterns.aggregate(QUERY)
-        matching_patterns_count = len(list(matching_patterns))
-        matching_patterns = collection_BugPatterns.aggregate(QUERY)
-        self.matching_patterns = matching_patterns
-        return (matching_patterns, matching_patterns_count)
+        return collection_BugPatterns.aggregate(QUERY)
+
+    def cache_batch_patterns(self, batch_patterns: Dict[str, List[MatchingPattern]]) -> None:
+        """ This method puts the patterns retrieved by a batch query in the session's cache.
+
+        :param batch_patterns: The patterns of each hex digest.
+        :type  batch_patterns: Dict[str, List[MatchingPattern]]
+        """
+        if self.pattern_cache is None:
+            return
+        for hexdigest, matching_patterns in batch_patterns.items():
+            self.pattern_cache.put((hexdigest, self.max_complexity), matching_patterns)
     
     def apply_bugfix_pattern(self, 
         bugged_node: NodeAbstractor, 
@@ -111,7 +594,8 @@ class HypothesisGenerator():
         """ This method applies the fix-pattern to the abstracted node.
 
         This method returns an iterator of hypotheses generated
-        due to the application of the fix-pattern.
+        due to the application of the fix-pattern. The hypotheses are
+        abducted lazily, up to MAX_HYPOTHESES_PER_PATTERN of them.
         
         :param bugged_node: The abstracted node object.
         :type  bugged_node: NodeAbstractor
@@ -121,34 +605,34 @@ class HypothesisGenerator():
         :type  available_identifiers: IDTokens
         :rtype: Iterator[Hypotheses]
         """
-        hypotheses = HypothesisAbductor(bugged_node, pattern, available_identifiers)
+        fix_template = self.get_fix_template(pattern)
+        hypotheses = HypothesisAbductor(bugged_node, pattern, available_identifiers, fix_template)
+        if DebugController.MAX_HYPOTHESES_PER_PATTERN > 0:
+            return islice(hypotheses, DebugController.MAX_HYPOTHESES_PER_PATTERN)
         return iter(hypotheses)
 
-    def build_hypothesis_model(self, hypothesis: Hypothesis) -> Union[str, None]:
-        """ This method creates a new model to test the given hypothesis.
-        
-        :param hypothesis: The hypothesis that need a model.
-        :type  hypothesis: Hypothesis
-        :rtype: Union[str, None]
+    def get_fix_template(self, pattern: MatchingPattern) -> Union[FixTemplate, None]:
+        """ This method returns the compiled fix template of a pattern, None means it is not used.
+
+        The templates are cached by the hexdigest of the pattern's fix,
+        which is the hexdigest of its abstract node.
+
+        :param pattern: The fix pattern.
+        :type  pattern: MatchingPattern
+        :rtype: Union[FixTemplate, None]
         """
-        new_model_src = self.get_current_model()
-        if self.nested_node == 'elif' and re.search('if.*', hypothesis):
-            hypothesis = 'el' + hypothesis
-        indent = re.split('\w', new_model_src[self.candidate - 1])
-        hypothesis = indent[0] + hypothesis + '\n'
-        new_model_src[self.candidate - 1] = hypothesis
-        
-        curr_dir = Path(__file__).parent.parent.resolve()
-        new_model_filename = f"model{str(self.abduction_depth+1)}.py"
-        new_model_path = curr_dir.joinpath('temp', new_model_filename)
-        
-        try:
-            with open(new_model_path, 'w') as m:
-                m.writelines(new_model_src)
-        except Exception as e:
-            AbinLogging.debugging_logger.exception(f"Unable to parse the new model {new_model_filename}.")
+        if not DebugController.COMPILED_FIX_TEMPLATES:
             return None
-        return hypothesis
+        abstract_node = pattern['fix_metadata']['abstract_node']
+        fix_hexdigest = hashlib.sha256(abstract_node.encode('utf-8')).hexdigest()
+        fix_template = None
+        if self.fix_template_cache is not None:
+            fix_template = self.fix_template_cache.get(fix_hexdigest)
+        if fix_template is None:
+            fix_template = FixTemplate(abstract_node)
+            if self.fix_template_cache is not None:
+                self.fix_template_cache.put(fix_hexdigest, fix_template)
+        return fix_template
 
     def __iter__(self) -> None:
         """ Class Iterator Constructor """
@@ -169,12 +653,28 @@ class HypothesisGenerator():
                 if self.nested_node == 'elif' and re.search('if.*', hypothesis):
                     # Check if the hypothesis is part of an elif nested structure
                     hypothesis = 'el' + hypothesis
+                if self.is_duplicate(hypothesis, self.hypotheses_set_position):
+                    self.skipped_hypotheses += 1
+                    hypothesis = None
+                    continue
+                if self.hypothesis_validator is not None:
+                    rejection_reason = self.hypothesis_validator.validate(hypothesis, self.hypotheses_set_position)
+                    if rejection_reason is not None:
+                        self.rejected_hypotheses[rejection_reason] += 1
+                        hypothesis = None
+                        continue
             except StopIteration:
                 pattern: Union[MatchingPattern, None] = None
                 while pattern is None:
                     try:
                         pattern = next(self.matching_patterns)
                     except StopIteration:
+                        if self.pattern_cursor is not None:
+                            AbinLogging.debugging_logger.info(f"""
+                            Candidate: {self.candidate}. Patterns Found: {len(self.pattern_cursor)}
+                            """
+                            )
+                            self.pattern_cursor = None
                         try:
                             self.candidate = self.get_bug_candidate()
                         except StopIteration:
@@ -182,33 +682,49 @@ class HypothesisGenerator():
                             AbinLogging.debugging_logger.info(msg_)
                             raise StopIteration(msg_)
                         else:
-                            model = self.model_src
-                            logical_loc = self.LogicalLOC(self.candidate, '\n'.join(model))
-                            ast_bug_candidate = deepcopy(logical_loc.ast_node)
-                            ast_hexdigest = self.abstract_bug_candidate(ast_bug_candidate)
-                            self.nested_node = logical_loc.get_nested_node()
-                            ast_bug_candidate = deepcopy(logical_loc.ast_node)
-                            available_identifiers = logical_loc.get_available_identifiers()
-                            patterns = self.get_matching_patterns(ast_hexdigest)
-                            (self.matching_patterns, count) = patterns
+                            ast_hexdigest = self.get_candidate_hexdigest(self.candidate)
+                            self.pattern_cursor = self.get_candidate_patterns(ast_hexdigest)
+                            if self.pattern_scheduler is None:
+                                self.matching_patterns = iter(self.pattern_cursor)
+                            else:
+                                self.matching_patterns = iter(self.pattern_scheduler.schedule(self.pattern_cursor))
                             AbinLogging.debugging_logger.info(f"""
-                            Current Candidate: {self.candidate}. Patterns Found: {count}
+                            Current Candidate: {self.candidate}.
                             """
                             )
                 
-                model = self.model_src
-                logical_loc = self.LogicalLOC(self.candidate, '\n'.join(model))
+                logical_loc = self.get_logical_loc(self.candidate)
                 self.nested_node = logical_loc.get_nested_node()
                 ast_bug_candidate = deepcopy(logical_loc.ast_node)
-                available_identifiers = logical_loc.get_available_identifiers()
+                if DebugController.SCOPE_IDENTIFIER_PRUNING and self.model_index.is_parsed:
+                    # Only the identifiers visible from the candidate's scope fill up the pattern.
+                    available_identifiers = self.model_index.get_scope_identifiers(self.candidate)
+                    pattern = dict(pattern, available_identifiers=self.model_index.get_visible_identifiers(
+                        self.candidate, pattern['available_identifiers']))
+                else:
+                    available_identifiers = logical_loc.get_available_identifiers()
                 self.hypotheses_set = self.apply_bugfix_pattern(ast_bug_candidate, pattern, available_identifiers)
                 self.hypotheses_set_complexity = pattern['complexity']
+                self.current_pattern = pattern
+                if self.pattern_scheduler is not None:
+                    self.pattern_scheduler.record_attempt(pattern)
                 self.hypotheses_set_position = self.candidate
 
         self.abduction_breadth += 1
         # The explanatory power is set to 0 for untested hypotheses.
         return (hypothesis, self.hypotheses_set_position, 0)
 
+    def record_repair(self, pattern: MatchingPattern = None) -> None:
+        """ This method records that the pattern of a hypothesis repaired the defect.
+
+        :param pattern: The hypothesis' pattern, the pattern of the last hypothesis by default.
+        :type  pattern: MatchingPattern
+        """
+        if pattern is None:
+            pattern = self.current_pattern
+        if self.pattern_scheduler is not None and pattern is not None:
+            self.pattern_scheduler.record_success(pattern)
+
     def __enter__(self):
         """ Context manager method. """
         AbinLogging.debugging_logger.debug('Entering HypothesisGenerator')
@@ -230,14 +746,22 @@ class HypothesisGenerator():
         :rtype: bool
         """
         AbinLogging.debugging_logger.debug('Exiting HypothesisGenerator')
+        if self.pattern_prefetcher is not None:
+            self.pattern_prefetcher.shutdown()
         AbinLogging.debugging_logger.info(f"""
             <=== Hypothesis Generator Process Summary ===>
             Current Candidate: {self.candidate}
-            Remaining Candidates: {list(self.bug_candidates)}
+            Remaining Candidates: {list(self.upcoming_candidates) + list(self.bug_candidates)}
             Abduction Maximum Complexity: {self.hypotheses_set_complexity}
             Total Number of Hypotheses Generated: {self.abduction_breadth}
+            Duplicated Hypotheses Skipped: {self.skipped_hypotheses}
+            Invalid Hypotheses Rejected: {dict(self.rejected_hypotheses)}
             """
         )
+        if self.pattern_cache is not None:
+            AbinLogging.debugging_logger.info(
+                f"Pattern Cache Hits: {self.pattern_cache.hits}, Misses: {self.pattern_cache.misses}"
+            )
         if exc_tp is not None:
             from traceback import format_exc
             AbinLogging.debugging_logger.warning(f"""
@@ -253,42 +777,14 @@ class HypothesisGenerator():
             AbinLogging.debugging_logger.debug(f"{format_exc()}")
         return True  # Ignore exception, if any
 
-    def get_current_model(self) -> List[str]:
-        """ This method returns the model source code.
-        :rtype: List[str]
-        """
-        curr_dir = Path(__file__).parent.parent.resolve()
-        curr_model_path = curr_dir.joinpath('temp', self.model_name)
-        try:
-            with open(curr_model_path, 'r') as f:
-                model_src = f.readlines()
-        except Exception as e:
-            AbinLogging.debugging_logger.exception(
-                f"Unable to open the file: {self.model_name}."
-            )
-            return False
-        return model_src
-
-    @property
-    def model_name(self) -> str:
-        """ This property represents the current model name. """
-        return f"model{str(self.abduction_depth)}.py"
-
-    @property
-    def model_path(self) -> str:
-        """ This property represents the current model path"""
-        curr_dir = Path(__file__).parent.parent.resolve()
-        curr_model_path = curr_dir.joinpath('temp', self.model_name)
-        return curr_model_path
-
     @staticmethod
-    def mongodb_connection() -> MongoClient:
+    def mongodb_connection() -> Database:
         """ This method returns a connection to the database.
-        :rtype: MongoClient
+
+        The connection is taken from the process-wide pooled client.
+        :rtype: Database
         """
         config = DebugController.APP_SETTINGS
-        MONGO_URI = f"{config['DB_URI']}://{config['DB_HOST']}:{config['DB_PORT']}"
-        client = MongoClient(MONGO_URI)
-        db_connection = client[config['DEBUG_DB_NAME']]
+        db_connection = db_client_manager.get_database(config['DEBUG_DB_NAME'])
         return db_connection
 
@@ -18,6 +18,7 @@ class BugfixMetadata(TypedDict):
     available_identifiers: IDTokens
     bug_metadata: NodeMetadata
     fix_metadata: NodeMetadata
+    complexity: int
 
 class Bugfix():
   """ This class is used to extract a bugfix
@@ -76,7 +77,9 @@ class Bugfix():
             "commit_sha": "",
             "available_identifiers": self.get_available_identifiers(),
             "bug_metadata": bug_metadata.copy(),
-            "fix_metadata": fix_metadata.copy()
+            "fix_metadata": fix_metadata.copy(),
+            # The number of abstracted identifiers in the fix.
+            "complexity": len(fix_metadata['map_ids'])
         }
         self._notes = 'Correct Bugfix.'
       else:
@@ -1,13 +1,16 @@
 """
-This module contains the core class HypothesisAbductor.
-This class is used to abduct a hypotheses.
+This module contains the core class HypothesisAbductor and the support class FixTemplate.
+The HypothesisAbductor class is used to abduct a hypotheses.
+The FixTemplate class is used to render the hypotheses of a fix-pattern
+without rebuilding and unparsing its AST for each one of them.
 """
 import ast
 import astunparse
+from astunparse.unparser import INFSTR
 import re
 import copy
 import itertools
-from typing import Union, Type, Tuple, List
+from typing import Any, Union, Type, Tuple, List
 from model.abstractor.Bugfix import BugfixMetadata
 from model.abstractor.NodeAbstractor import IDMapping, NodeAbstractor, NodeMapping
 from model.abstractor.NodeMapper import ASTIdentifiers, ASTNode, IDTokens
@@ -22,12 +25,18 @@ class HypothesisAbductor(ast.NodeVisitor):
   posible_ids: Type[itertools.product]
   map_tuple_ordering: List
 
+  fix_template: Union[None, 'FixTemplate']
+
   def __init__(self,
         node_to_abduct: ASTNode,
         bugfix: BugfixMetadata,
-        available_identifiers: IDTokens = []) -> None:
+        available_identifiers: IDTokens = [],
+        fix_template: Union[None, 'FixTemplate'] = None) -> None:
     """ Constructor method """
     self.abducted_fix = None
+    if fix_template is not None and not fix_template.is_compiled:
+      fix_template = None
+    self.fix_template = fix_template
     self.ast_identifiers = ['id', 'n', 's', 'name', 'asname', 'module', 'attr', 'arg']
     self.available_identifiers = self.merge_available_identifiers(
                                           available_identifiers, 
@@ -66,17 +75,7 @@ class HypothesisAbductor(ast.NodeVisitor):
         node_id = getattr(node, ast_id, None)
         node_id = str(node_id)
         if node_id in self.abducted_fix.map_ids:
-          abduction = self.abducted_fix.map_ids[node_id]
-          node_type = re.sub('\d+$', '', node_id)
-          if node_type == 'Num':
-            if self.is_int(abduction):
-              abduction = int(abduction)
-            elif self.is_float(abduction):
-              abduction = float(abduction)
-            elif self.is_complex(abduction):
-              abduction = complex(abduction)
-          elif node_type == 'Bytes':
-            abduction = bytes(abduction, 'utf-8')
+          abduction = self.get_typed_abduction(node_id, self.abducted_fix.map_ids[node_id])
           setattr(node, ast_id, abduction)
 
   def generic_visit(self, node: ASTNode) -> None:
@@ -166,6 +165,7 @@ class HypothesisAbductor(ast.NodeVisitor):
 
     This method will iterate over all posible hypotheses
     until the iterator `self.posible_ids` is exhausted.
+    The hypotheses are rendered with the fix template, if any.
     
     : rtype: str
     """
@@ -175,6 +175,11 @@ class HypothesisAbductor(ast.NodeVisitor):
       self.abducted_fix = None
       raise StopIteration
     else:
+      if self.fix_template is not None:
+        (new_mapping_id, _) = self.next_abductive_mapping()
+        hypothesis = self.fix_template.render(new_mapping_id)
+        if hypothesis is not None:
+          return hypothesis
       self.abduct_fix()
       return self.hypothesis
 
@@ -196,6 +201,28 @@ class HypothesisAbductor(ast.NodeVisitor):
       identifiers[id] = list(set1.union(set2))
     return identifiers
 
+  @staticmethod
+  def get_typed_abduction(node_id: str, abduction: Any) -> Any:
+    """ This method converts an abduction to the type of the abstracted identifier.
+
+    :param node_id: The abstracted identifier, e.g. Num0.
+    :type  node_id: str
+    :param abduction: The identifier that replaces it.
+    :type  abduction: Any
+    :rtype: Any
+    """
+    node_type = re.sub('\d+$', '', node_id)
+    if node_type == 'Num':
+      if HypothesisAbductor.is_int(abduction):
+        abduction = int(abduction)
+      elif HypothesisAbductor.is_float(abduction):
+        abduction = float(abduction)
+      elif HypothesisAbductor.is_complex(abduction):
+        abduction = complex(abduction)
+    elif node_type == 'Bytes':
+      abduction = bytes(abduction, 'utf-8')
+    return abduction
+
   @staticmethod
   def is_int(x):
     """ This method checks if a given string is an integer type """
@@ -224,4 +251,110 @@ class HypothesisAbductor(ast.NodeVisitor):
     except (TypeError, ValueError):
       return False
     else:
-      return True
\ No newline at end of file
+      return True
+
+
+class FixTemplate():
+  """ This class is a fix-pattern's source code compiled with a slot per abstracted identifier.
+
+  The abstract node is rebuilt and unparsed once with a placeholder in each slot,
+  then a hypothesis is rendered by writing its identifiers in the slots, as
+  `HypothesisAbductor.abduct_fix` would. The constants are written as astunparse does,
+  thus the patterns that unparse a constant depending on its context (inside
+  an f-string or before an attribute) are not compiled. A rendering that could
+  differ from the abducted one returns None, then the AST is abducted as usual.
+  """
+  abstract_node: str
+  parts: List[str]
+  slots: List[Tuple[str, bool]]
+  is_compiled: bool
+
+  # The placeholders written in the identifiers' slots and in the constants' slots.
+  ID_SLOT = '__abin_id_{}__'
+  CONSTANT_SLOT = '__abin_constant_{}__'
+  SLOT_REGEX = re.compile(r"'__abin_constant_(\d+)__'|__abin_id_(\d+)__")
+
+  def __init__(self, abstract_node: str) -> None:
+    """ Constructor method """
+    self.abstract_node = abstract_node
+    self.parts = []
+    self.slots = []
+    self.is_compiled = False
+    try:
+      self.is_compiled = self.compile_template()
+    except Exception:
+      self.is_compiled = False
+
+  def compile_template(self) -> bool:
+    """ This method splits the unparsed fix-pattern into its static parts and slots.
+
+    :rtype: bool
+    """
+    fix_node = eval(self.abstract_node, vars(ast), {})
+    unsafe_constants = set()
+    for node in ast.walk(fix_node):
+      if isinstance(node, ast.JoinedStr):
+        unsafe_constants.update(id(child) for child in ast.walk(node))
+      elif isinstance(node, ast.Attribute):
+        unsafe_constants.add(id(node.value))
+    slots = []
+    for node in ast.walk(fix_node):
+      if isinstance(node, ast.Constant):
+        # The constants are visited once, `n` and `s` are both aliases of `value`.
+        if id(node) in unsafe_constants or not isinstance(node.value, str):
+          return False
+        slots.append((node.value, True))
+        node.value = self.CONSTANT_SLOT.format(len(slots) - 1)
+        continue
+      for ast_id in ('id', 'name', 'asname', 'module', 'attr', 'arg'):
+        if hasattr(node, ast_id):
+          node_id = getattr(node, ast_id, None)
+          if not isinstance(node_id, str):
+            return False
+          slots.append((node_id, False))
+          setattr(node, ast_id, self.ID_SLOT.format(len(slots) - 1))
+    LOC = astunparse.unparse(fix_node)
+    parts = []
+    slots_order = []
+    last_end = 0
+    for match in self.SLOT_REGEX.finditer(LOC):
+      parts.append(LOC[last_end:match.start()])
+      slots_order.append(int(match.group(1) or match.group(2)))
+      last_end = match.end()
+    parts.append(LOC[last_end:])
+    if sorted(slots_order) != list(range(len(slots))):
+      return False
+    self.parts = parts
+    self.slots = [slots[i] for i in slots_order]
+    return True
+
+  def render(self, map_ids: IDMapping) -> Union[str, None]:
+    """ This method renders the hypothesis of an identifiers mapping, None means it must be abducted.
+
+    :param map_ids: The mapping of the abstracted identifiers to the hypothesis' identifiers.
+    :type  map_ids: IDMapping
+    :rtype: Union[str, None]
+    """
+    LOC = [self.parts[0]]
+    for ((node_id, is_constant), part) in zip(self.slots, self.parts[1:]):
+      if node_id not in map_ids:
+        abduction = node_id
+      else:
+        abduction = map_ids[node_id]
+        if is_constant:
+          abduction = HypothesisAbductor.get_typed_abduction(node_id, abduction)
+          # The abducted constant would be replaced again through its other alias.
+          if str(abduction) in map_ids:
+            return None
+        elif not isinstance(abduction, str) or not abduction:
+          # astunparse omits some of the empty identifiers (e.g. `asname`).
+          return None
+      if not is_constant:
+        LOC.append(abduction)
+      elif isinstance(abduction, (float, complex)):
+        LOC.append(repr(abduction).replace('inf', INFSTR))
+      else:
+        LOC.append(repr(abduction))
+      LOC.append(part)
+    #just keep the unicode str of LOC
+    return re.sub('[\t\n\r\f\v]', '', ''.join(LOC))
@@ -0,0 +1,320 @@
+"""
+This module contains the support class ModelIndex.
+This class is used to tokenize and parse a model's source code once,
+so the logical lines, the AST nodes and the available identifiers
+of all its lines can be obtained without parsing it again.
+"""
+import tokenize
+from io import BytesIO
+import re
+import ast
+import builtins
+import symtable
+from typing import Dict, Iterator, List, Set, Tuple, Union
+from model.abstractor.NodeMapper import NodeMapper, IDTokens, ASTNode
+
+ScopeNode = Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef]
+
+LogicalLOC = Union[Tuple[str, int, int], Tuple[None, int, int]]
+
+class ModelIndex():
+  """ This class acts as an index of a model's source code.
+
+  It holds three tables built in a single pass each:
+  the logical LOC of every line (as in PythonLLOC.logical_LOC),
+  the first AST node (in breadth-first order) of every line and
+  the identifiers available in the whole model.
+  A table that could not be built is None, then PythonLLOC parses the source as usual.
+  """
+  source_code: str
+  logical_LOCs: Union[Dict[int, LogicalLOC], None]
+  last_logical_LOC: Union[LogicalLOC, None]
+  line_nodes: Union[Dict[int, Tuple[int, ASTNode]], None]
+  id_tokens: Union[IDTokens, None]
+  tree: Union[ASTNode, None]
+  module_names: Union[Set[str], None]
+  scope_chains: Dict[int, List[symtable.SymbolTable]]
+  inline_scope_names: Dict[int, Set[str]]
+  scope_identifiers: Dict[int, IDTokens]
+
+  def __init__(self, src: str) -> None:
+    """Constructor Method"""
+    self.source_code = src
+    self.logical_LOCs = None
+    self.last_logical_LOC = None
+    self.line_nodes = None
+    self.id_tokens = None
+    self.tree = None
+    self.module_names = None
+    self.scope_chains = {}
+    self.inline_scope_names = {}
+    self.scope_identifiers = {}
+    try:
+      self.index_logical_LOCs()
+    except Exception:
+      self.logical_LOCs = None
+    try:
+      tree = ast.parse(self.source_code, mode='exec')
+    except Exception:
+      return
+    self.tree = tree
+    self.index_line_nodes(tree)
+    self.id_tokens = NodeMapper(tree).id_tokens
+
+  def index_logical_LOCs(self) -> None:
+    """ This method maps every line to its logical LOC with a single tokenization.
+
+    The result of each line is the one PythonLLOC.logical_LOC would compute:
+    a line is resolved by the NEWLINE token that follows the first token covering it,
+    or as a comment if the first token that starts on it is a comment. The lines
+    that are never resolved get the logical LOC left at the end of the tokens.
+    """
+    logical_LOCs: Dict[int, LogicalLOC] = {}
+    pending_lines: List[int] = []
+    started_lines = set()
+    curr_LOC: str = ''
+    curr_LOC_start: int = 0
+    token_line_end: int = 0
+    src_utf8 = self.source_code.encode('utf-8')
+    bytes_io = BytesIO(src_utf8).readline
+    tokens = tokenize.tokenize(bytes_io)
+
+    for etype, string, start, end, _ in tokens:
+      token_line_start = start[0]
+      token_line_end = end[0]
+      if token_line_start not in started_lines:
+        started_lines.add(token_line_start)
+        if etype == tokenize.COMMENT and token_line_start not in logical_LOCs:
+          logical_LOCs[token_line_start] = (None, curr_LOC_start, token_line_end)
+
+      for line_no in range(token_line_start, token_line_end + 1):
+        if line_no not in logical_LOCs:
+          pending_lines.append(line_no)
+
+      if etype == tokenize.NEWLINE:
+        LOC = curr_LOC if re.search('\S', curr_LOC) else None
+        for line_no in pending_lines:
+          logical_LOCs.setdefault(line_no, (LOC, curr_LOC_start, token_line_end))
+        pending_lines.clear()
+        curr_LOC = ''
+        curr_LOC_start = token_line_start + 1
+        continue
+
+      if (etype == tokenize.COMMENT or etype == tokenize.STRING or
+          etype == tokenize.ENCODING or etype == tokenize.NL):
+        continue
+      curr_LOC += string + ' '
+    LOC = curr_LOC if re.search('\S', curr_LOC) else None
+    self.last_logical_LOC = (LOC, curr_LOC_start, token_line_end)
+    self.logical_LOCs = logical_LOCs
+
+  def index_line_nodes(self, tree: ASTNode) -> None:
+    """ This method maps every line to the first node (in breadth-first order) that starts on it.
+
+    :param tree: The model's AST.
+    :type  tree: ASTNode
+    """
+    line_nodes: Dict[int, Tuple[int, ASTNode]] = {}
+    for order, node in enumerate(ast.walk(tree)):
+      if hasattr(node, 'lineno') and node.lineno not in line_nodes:
+        line_nodes[node.lineno] = (order, node)
+    self.line_nodes = line_nodes
+
+  def get_logical_LOC(self, line_no: int) -> Union[LogicalLOC, None]:
+    """ This method returns the logical LOC of a line, None means it is not indexed.
+
+    :param line_no: The line number.
+    :type  line_no: int
+    :rtype: Union[LogicalLOC, None]
+    """
+    if self.logical_LOCs is None:
+      return None
+    return self.logical_LOCs.get(line_no, self.last_logical_LOC)
+
+  def get_ast_node(self, line_start: int, line_end: int) -> Union[ASTNode, None]:
+    """ This method returns the first node (in breadth-first order) that starts in the given lines.
+
+    :param line_start: The first line of the logical LOC.
+    :type  line_start: int
+    :param line_end: The last line of the logical LOC.
+    :type  line_end: int
+    :rtype: Union[ASTNode, None]
+    """
+    first_node = None
+    for line_no in range(line_start, line_end + 1):
+      line_node = self.line_nodes.get(line_no, None)
+      if line_node is not None and (first_node is None or line_node[0] < first_node[0]):
+        first_node = line_node
+    return None if first_node is None else first_node[1]
+
+  def get_available_identifiers(self) -> IDTokens:
+    """ This method returns a copy of all the identifiers in the model.
+
+    :rtype: IDTokens
+    """
+    return {node_name: set(ids) for node_name, ids in self.id_tokens.items()}
+
+  def get_scope_identifiers(self, line_no: int) -> IDTokens:
+    """ This method returns a copy of the identifiers visible from a line.
+
+    The identifiers are those used in the top-level statement (e.g. the function)
+    that holds the line, or in the whole model for the module-level lines.
+    Then the names are pruned to those visible in the line's scope: the locals
+    and parameters of the scope and its enclosing functions, the names bound by
+    the lambdas and comprehensions over the line, and the module's globals
+    and built-ins; the other identifiers (e.g. attributes) are kept.
+
+    :param line_no: The line number.
+    :type  line_no: int
+    :rtype: IDTokens
+    """
+    if line_no not in self.scope_identifiers:
+      scope_node = self.tree
+      for node in self.tree.body:
+        start = min([node.lineno] + [x.lineno for x in getattr(node, 'decorator_list', [])])
+        if start <= line_no <= node.end_lineno and isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+          scope_node = node
+          break
+      self.scope_identifiers[line_no] = self.get_visible_identifiers(line_no, NodeMapper(scope_node).id_tokens)
+    return {node_name: set(ids) for node_name, ids in self.scope_identifiers[line_no].items()}
+
+  def get_visible_identifiers(self, line_no: int, id_tokens: IDTokens) -> IDTokens:
+    """ This method returns a copy of the given identifiers without the names not visible from a line.
+
+    Only the names are pruned, the type of the other identifiers (e.g. attributes)
+    is not known statically. The built-ins are mapped apart from the names.
+
+    :param line_no: The line number.
+    :type  line_no: int
+    :param id_tokens: The identifiers, e.g. those of a bug-fix pattern.
+    :type  id_tokens: IDTokens
+    :rtype: IDTokens
+    """
+    if line_no not in self.scope_chains:
+      self.scope_chains[line_no] = self.get_scope_chain(self.tree, self.source_code, line_no)
+      self.inline_scope_names[line_no] = self.get_inline_scope_names(self.tree, line_no)
+    scope_chain = self.scope_chains[line_no]
+    inline_scope_names = self.inline_scope_names[line_no]
+    visible_identifiers = {node_name: set(ids) for node_name, ids in id_tokens.items()}
+    if 'Name' in visible_identifiers:
+      visible_identifiers['Name'] = {
+        name for name in visible_identifiers['Name']
+        if name in inline_scope_names or self.is_visible(name, scope_chain)
+      }
+    return visible_identifiers
+
+  def is_visible(self, name: str, scope_chain: List[symtable.SymbolTable]) -> bool:
+    """ This method checks if a name may be loaded from the innermost scope of a chain.
+
+    :param name: The name.
+    :type  name: str
+    :param scope_chain: The symbol tables from the module to the innermost scope.
+    :type  scope_chain: List[SymbolTable]
+    :rtype: bool
+    """
+    if self.module_names is None:
+      self.module_names = self.get_module_names(self.tree, self.source_code)
+    if name in self.module_names:
+      return True
+    (*enclosing_scopes, scope) = scope_chain
+    if scope.get_type() != 'module' and name in scope.get_identifiers():
+      symbol = scope.lookup(name)
+      if symbol.is_local() or symbol.is_parameter() or symbol.is_free():
+        return True
+    # The class scopes are not visible from their methods.
+    return any(table.get_type() == 'function' and name in table.get_identifiers()
+      and table.lookup(name).is_local() for table in enclosing_scopes)
+
+  @staticmethod
+  def get_module_names(tree: ASTNode, src: str) -> Set[str]:
+    """ This method returns the names that may be bound in a module's namespace, including the built-ins.
+
+    :param tree: The module's AST.
+    :type  tree: ASTNode
+    :param src: The module's source code.
+    :type  src: str
+    :rtype: Set[str]
+    """
+    module_names = set(dir(builtins))
+    for node in ast.walk(tree):
+      if isinstance(node, ast.Global):
+        module_names.update(node.names)
+    for symbol in symtable.symtable(src, '<model>', 'exec').get_symbols():
+      if symbol.is_assigned() or symbol.is_imported() or symbol.is_namespace():
+        module_names.add(symbol.get_name())
+    return module_names
+
+  @staticmethod
+  def get_scope_chain(tree: ASTNode, src: str, line_no: int) -> List[symtable.SymbolTable]:
+    """ This method returns the symbol tables from the module to the innermost scope that holds a line.
+
+    :param tree: The module's AST.
+    :type  tree: ASTNode
+    :param src: The module's source code.
+    :type  src: str
+    :param line_no: The line number.
+    :type  line_no: int
+    :rtype: List[SymbolTable]
+    """
+    scope_chain = [symtable.symtable(src, '<model>', 'exec')]
+    scope_node = tree
+    while True:
+      # The header of a scope (e.g. the default values) belongs to the enclosing scope.
+      inner_nodes = [node for node in ModelIndex.iter_scope_nodes(scope_node)
+        if node.lineno < line_no <= node.end_lineno]
+      if not inner_nodes:
+        return scope_chain
+      scope_node = inner_nodes[0]
+      children = [table for table in scope_chain[-1].get_children()
+        if table.get_name() == scope_node.name and table.get_lineno() == scope_node.lineno]
+      if not children:
+        return scope_chain
+      scope_chain.append(children[0])
+
+  @staticmethod
+  def get_inline_scope_names(tree: ASTNode, line_no: int) -> Set[str]:
+    """ This method returns the names bound by the lambdas and comprehensions over a line.
+
+    These scopes are not functions or classes (see get_scope_chain),
+    their parameters and targets are visible from the line itself.
+
+    :param tree: The module's AST.
+    :type  tree: ASTNode
+    :param line_no: The line number.
+    :type  line_no: int
+    :rtype: Set[str]
+    """
+    inline_scope_names = set()
+    nodes = [tree]
+    while nodes:
+      node = nodes.pop()
+      if hasattr(node, 'lineno') and not node.lineno <= line_no <= node.end_lineno:
+        continue
+      if isinstance(node, ast.Lambda):
+        args = node.args
+        inline_scope_names.update(arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs)
+        inline_scope_names.update(arg.arg for arg in (args.vararg, args.kwarg) if arg is not None)
+      elif isinstance(node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+        inline_scope_names.update(target.id for generator in node.generators
+          for target in ast.walk(generator.target) if isinstance(target, ast.Name))
+      nodes.extend(ast.iter_child_nodes(node))
+    return inline_scope_names
+
+  @staticmethod
+  def iter_scope_nodes(node: ASTNode) -> Iterator[ScopeNode]:
+    """ This method yields the scopes (functions and classes) defined directly in a node's scope.
+
+    :param node: The AST node.
+    :type  node: ASTNode
+    :rtype: Iterator[ScopeNode]
+    """
+    for child in ast.iter_child_nodes(node):
+      if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        yield child
+      else:
+        yield from ModelIndex.iter_scope_nodes(child)
+
+  @property
+  def is_parsed(self) -> bool:
+    """ This property represents whether the model's AST was indexed. """
+    return self.line_nodes is not None
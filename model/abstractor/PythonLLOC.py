@@ -8,20 +8,24 @@ import re
 import ast
 from typing import Tuple, Union
 from model.abstractor.NodeMapper import NodeMapper, IDTokens, ASTNode
-
-LogicalLOC = Union[Tuple[str, int, int], Tuple[None, int, int]]
+from model.abstractor.ModelIndex import ModelIndex, LogicalLOC
 
 class PythonLLOC(NodeMapper):
   """ This class acts as a support class to obtain
-  a Python Logical Line of Code (PythonLLOC). """
+  a Python Logical Line of Code (PythonLLOC).
+
+  If the ModelIndex of the source code is given, the tokens and
+  the AST are read from it instead of parsing the source code again. """
   
   id_tokens: Union[None, IDTokens]
   line_no: int
   source_code: str
-  def __init__(self, line_num: int, src: str) -> None:
+  model_index: Union[ModelIndex, None]
+  def __init__(self, line_num: int, src: str, model_index: ModelIndex = None) -> None:
       """Constructor Method"""
       self.line_no = line_num
       self.source_code = src
+      self.model_index = model_index
       self.id_tokens = None
 
   @property
@@ -32,6 +36,10 @@ class PythonLLOC(NodeMapper):
     if not found then an empty string will be returned.
     :rtype: LogicalLOC
     """
+    if self.model_index is not None:
+      logical_LOC = self.model_index.get_logical_LOC(self.line_no)
+      if logical_LOC is not None:
+        return logical_LOC
     curr_LOC: str = ''
     curr_LOC_start: int = 0
     found_LOC = False
@@ -91,6 +99,8 @@ class PythonLLOC(NodeMapper):
       line_end = logical_LOC[2]
     if LOC == None:
       return None
+    if self.model_index is not None and self.model_index.is_parsed:
+      return self.model_index.get_ast_node(line_start, line_end)
     try:
       tree = ast.parse(self.source_code, mode='exec')
     except Exception as e:
@@ -131,6 +141,9 @@ class PythonLLOC(NodeMapper):
         
     :rtype: IDTokens
     """
+    if self.model_index is not None and self.model_index.is_parsed:
+      self.id_tokens = self.model_index.get_available_identifiers()
+      return self.id_tokens
     try:
       ast_tree: ASTNode = ast.parse(self.source_code, mode='exec')
     except Exception as e:
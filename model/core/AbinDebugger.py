@@ -73,9 +73,13 @@ class AbinDebugger(OchiaiDebugger):
         :rtype: InfluencePath
         """
         if model is None: return []
+        # The failing outcomes may have been kept from a previous run (e.g. a
+        # partial run of the test suite), then there is nothing to rank.
+        if not self.collectors.get(self.FAIL): return []
         
         func_names = self.get_all_func_names(model)
         ranked_events = list(filter(lambda x: x[0] in func_names, self.rank()))
+        if not ranked_events: return []
         first_ranked_lineno = ranked_events[0][1]
 
         ranked_events_susp = list(map(lambda x: (x + (self.suspiciousness(x),)), ranked_events))
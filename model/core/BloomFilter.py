@@ -0,0 +1,64 @@
+"""
+This module contains the BloomFilter class.
+This class is in charge of remembering a large number of keys
+in a fixed amount of memory, at the cost of some false positives.
+"""
+import hashlib
+import math
+from typing import Tuple
+
+class BloomFilter():
+    """ This class is a Bloom filter of strings.
+
+    The number of bits and hash functions are sized for the expected
+    number of keys (`capacity`) and the accepted false positive rate.
+    A key that was added is always reported as contained; a key that was
+    not added may be reported as contained with (about) `error_rate` probability.
+    """
+    capacity: int
+    error_rate: float
+    no_bits: int
+    no_hashes: int
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        """ Constructor Method """
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.no_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.no_hashes = max(1, round(self.no_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.no_bits + 7) // 8)
+
+    def get_hashes(self, key: str) -> Tuple[int, int]:
+        """ This method returns the two base hashes of a key (double hashing).
+
+        :param key: The key.
+        :type  key: str
+        :rtype: Tuple[int, int]
+        """
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        return (int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1)
+
+    def add(self, key: str) -> None:
+        """ This method adds a key to the filter.
+
+        :param key: The key.
+        :type  key: str
+        """
+        (hash1, hash2) = self.get_hashes(key)
+        for i in range(self.no_hashes):
+            bit = (hash1 + i * hash2) % self.no_bits
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+
+    def __contains__(self, key: str) -> bool:
+        """ This method checks if a key may have been added to the filter.
+
+        :param key: The key.
+        :type  key: str
+        :rtype: bool
+        """
+        (hash1, hash2) = self.get_hashes(key)
+        for i in range(self.no_hashes):
+            bit = (hash1 + i * hash2) % self.no_bits
+            if not self.bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
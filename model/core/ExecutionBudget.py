@@ -0,0 +1,110 @@
+"""
+This module contains the ExecutionBudget and BudgetInstrumenter classes.
+The ExecutionBudget class is a step counter that limits the execution
+of a model in a deterministic way, instead of a wall-clock timeout.
+The BudgetInstrumenter class is in charge of instrumenting the loops
+and functions of a model in order to decrement the step counter.
+"""
+import ast
+import sys
+from typing import Union
+from model.abstractor.NodeMapper import ASTNode
+
+class BudgetExceeded(BaseException):
+    """ This exception is raised when a model runs out of execution steps.
+
+    It inherits from BaseException (as KeyboardInterrupt does) so a model
+    cannot swallow it with an `except Exception` clause inside a loop.
+    """
+    pass
+
+class ExecutionBudget():
+    """ This class represents the execution steps available to a model.
+
+    An instrumented model decrements `remaining` at every loop iteration
+    and every function entry, and raises `exceeded` once it runs out.
+    """
+    UNLIMITED: int = sys.maxsize
+    exceeded = BudgetExceeded
+    allotted: int
+    remaining: int
+
+    def __init__(self) -> None:
+        """ Constructor Method """
+        self.reset()
+
+    def reset(self, steps: Union[int, None] = None) -> None:
+        """ This method sets the available steps, None means unlimited.
+
+        :param steps: The number of steps.
+        :type  steps: Union[int, None]
+        """
+        self.allotted = self.UNLIMITED if steps is None else steps
+        self.remaining = self.allotted
+
+    @property
+    def used_steps(self) -> int:
+        """ This property represents the steps used since the last reset. """
+        return self.allotted - self.remaining
+
+
+class BudgetInstrumenter(ast.NodeTransformer):
+    """ This class instruments the loops and functions of a model.
+
+    A guard that decrements the budget is inserted at the beginning of
+    the body of every loop and function (after the docstring, if any).
+    The guard is located at the line of the statement that follows it,
+    so the coverage is not altered.
+    """
+    BUDGET_NAME: str = '__abin_budget__'
+    GUARD: str = (f"{BUDGET_NAME}.remaining -= 1\n"
+                  f"if {BUDGET_NAME}.remaining < 0: raise {BUDGET_NAME}.exceeded")
+
+    def instrument(self, tree: ASTNode) -> ASTNode:
+        """ This method returns the instrumented tree.
+
+        :param tree: The model's AST.
+        :type  tree: ASTNode
+        :rtype: ASTNode
+        """
+        return ast.fix_missing_locations(self.visit(tree))
+
+    def guard_body(self, node: ASTNode) -> ASTNode:
+        """ This method inserts the guard at the beginning of the node's body.
+
+        :param node: A loop or function node.
+        :type  node: ASTNode
+        :rtype: ASTNode
+        """
+        self.generic_visit(node)
+        # The guard goes after the docstring, so it is still the function's docstring.
+        position = 1 if self.has_docstring(node) else 0
+        first_stmt = node.body[min(position, len(node.body) - 1)]
+        guard = ast.parse(self.GUARD).body
+        for guard_stmt in guard:
+            for guard_node in ast.walk(guard_stmt):
+                if 'lineno' in guard_node._attributes:
+                    guard_node.lineno = guard_node.end_lineno = first_stmt.lineno
+                    guard_node.col_offset = guard_node.end_col_offset = first_stmt.col_offset
+        node.body = node.body[:position] + guard + node.body[position:]
+        return node
+
+    @staticmethod
+    def has_docstring(node: ASTNode) -> bool:
+        """ This method checks if the body of a function starts with a docstring.
+
+        :param node: A loop or function node.
+        :type  node: ASTNode
+        :rtype: bool
+        """
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return False
+        first_stmt = node.body[0]
+        return (isinstance(first_stmt, ast.Expr) and isinstance(first_stmt.value, ast.Constant)
+                and isinstance(first_stmt.value.value, str))
+
+    visit_FunctionDef = guard_body
+    visit_AsyncFunctionDef = guard_body
+    visit_For = guard_body
+    visit_AsyncFor = guard_body
+    visit_While = guard_body
@@ -0,0 +1,124 @@
+"""
+This module contains the HypothesisProducer class.
+This class is in charge of generating the hypotheses in a background
+thread while the previous hypotheses are being tested.
+"""
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from types import TracebackType
+from typing import Any, Optional, Tuple, Type
+import controller.AbinLogging as AbinLogging
+
+class HypothesisProducer():
+    """ This class runs a hypotheses generator in a background thread.
+
+    The generated hypotheses (along with the pattern they came from) are pushed
+    into a bounded queue, thus the producer waits whenever the tester falls
+    `queue_size` hypotheses behind. The producer is stopped when the consumer
+    leaves the context (e.g. after a correct hypothesis), the hypotheses
+    left in the queue are discarded.
+    It is used as the generator itself: as a context manager and an iterator.
+    """
+    queue_size: int
+    candidate: int
+
+    # The item that marks the end of the hypotheses.
+    END = None
+    # The interval (in seconds) to check for a cancellation while the queue is full.
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, generator: Any, queue_size: int = 16) -> None:
+        """ Constructor Method """
+        self.generator = generator
+        self.queue_size = queue_size
+        self.queue = Queue(maxsize=max(queue_size, 1))
+        self.stop_event = Event()
+        self.thread = Thread(target=self.produce, name='HypothesisProducer', daemon=True)
+        self.candidate = None
+        self.current_pattern = None
+
+    def produce(self) -> None:
+        """ This method is the entry point of the background thread. """
+        try:
+            # The generator's context manager logs and consumes its own exceptions.
+            with self.generator:
+                for hypothesis in self.generator:
+                    if not self.put((hypothesis, self.generator.current_pattern)):
+                        return
+        finally:
+            self.put(self.END)
+
+    def put(self, item: Optional[Tuple[Any, Any]]) -> bool:
+        """ This method waits until an item is put in the queue, False means it was cancelled.
+
+        :param item: The (hypothesis, pattern) or the end of the hypotheses.
+        :type  item: Optional[Tuple[Hypothesis, MatchingPattern]]
+        :rtype: bool
+        """
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=self.POLL_INTERVAL)
+            except Full:
+                continue
+            return True
+        return False
+
+    def cancel(self) -> None:
+        """ This method stops the background thread and discards the queued hypotheses. """
+        self.stop_event.set()
+        while self.thread.is_alive():
+            try:
+                self.queue.get_nowait()
+            except Empty:
+                pass
+            self.thread.join(self.POLL_INTERVAL)
+
+    def record_repair(self) -> None:
+        """ This method records that the pattern of the last consumed hypothesis repaired the defect. """
+        self.generator.record_repair(self.current_pattern)
+
+    def __iter__(self) -> None:
+        """ Class Iterator Constructor """
+        return self
+
+    def __next__(self) -> Any:
+        """ Class Iterator Next Constructor
+
+        This method waits for the next hypothesis of the background thread.
+
+        :rtype: Hypothesis
+        """
+        item = self.queue.get()
+        if item is self.END:
+            raise StopIteration
+        (hypothesis, self.current_pattern) = item
+        self.candidate = hypothesis[1]
+        return hypothesis
+
+    def __enter__(self):
+        """ Context manager method. """
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_tp: Type, exc_value: BaseException,
+                 exc_traceback: TracebackType) -> Optional[bool]:
+        """ Context manager method is used to stop the producer and ignore/consume all the exceptions.
+
+        The exceptions are consumed, as the generator's context manager does.
+
+        :param exc_tp: Type of the raised exception.
+        :type  exc_tp: Type
+        :param exc_value: The raised exception object.
+        :type  exc_value: BaseException
+        :param exc_traceback: The trace-back object of the exception.
+        :type  exc_traceback: TracebackType
+        :rtype: bool
+        """
+        self.cancel()
+        if exc_tp is not None:
+            AbinLogging.debugging_logger.warning(f"""
+                An error ocurred while the hypotheses were tested.
+                {exc_tp}: {exc_value}
+                """
+            )
+        return True  # Ignore exception, if any
@@ -0,0 +1,133 @@
+"""
+This module contains the HypothesisValidator class.
+This class is in charge of rejecting the hypotheses that cannot run,
+without loading the hypothesis model or executing any test case.
+"""
+import ast
+import re
+from typing import List, Set, Tuple, Union
+from model.abstractor.ModelIndex import ModelIndex
+
+# The reasons a hypothesis is rejected for.
+SYNTAX_ERROR = 'syntax_error'
+UNBOUND_NAME = 'unbound_name'
+
+class HypothesisValidator():
+    """ This class statically checks the hypotheses of a model.
+
+    Only the top-level statement that holds the hypothesis is patched and compiled.
+    Then the names loaded in the hypothesis are resolved with the symbol table of
+    the enclosing scope, the module's bindings and the built-ins. The check is
+    conservative: a name is only reported as unbound if no binding may exist
+    (e.g. the models with `from x import *` are never checked for names).
+    """
+    model_src: List[str]
+    top_level_ranges: List[Tuple[int, int]]
+    module_names: Set[str]
+    check_names: bool
+
+    def __init__(self, model_src: List[str]) -> None:
+        """ Constructor Method """
+        self.model_src = model_src
+        self.top_level_ranges = []
+        self.module_names = set()
+        self.check_names = True
+        try:
+            tree = ast.parse('\n'.join(model_src), mode='exec')
+        except SyntaxError:
+            # The model itself does not compile, the hypotheses are not checked.
+            self.check_names = False
+            return
+        for node in tree.body:
+            start = min([node.lineno] + [x.lineno for x in getattr(node, 'decorator_list', [])])
+            self.top_level_ranges.append((start, node.end_lineno))
+        self.index_module_names(tree)
+
+    def index_module_names(self, tree: ast.Module) -> None:
+        """ This method collects the names that may be bound in the module's namespace.
+
+        :param tree: The model's AST.
+        :type  tree: ast.Module
+        """
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and any(alias.name == '*' for alias in node.names):
+                self.check_names = False
+        self.module_names = ModelIndex.get_module_names(tree, '\n'.join(self.model_src))
+
+    def validate(self, hypothesis: str, position: int) -> Union[str, None]:
+        """ This method returns the reason to reject a hypothesis, None means it may run.
+
+        :param hypothesis: The hypothesis' source code.
+        :type  hypothesis: str
+        :param position: The line number of the hypothesis.
+        :type  position: int
+        :rtype: Union[str, None]
+        """
+        (start, end) = self.get_statement_range(position)
+        indent = re.split('\w', self.model_src[position - 1])[0]
+        # The previous lines are left blank, so the line numbers are those of the model.
+        statement_src = [''] * (start - 1) + self.model_src[start - 1:end]
+        statement_src[position - 1] = indent + hypothesis
+        statement_src = '\n'.join(statement_src)
+        try:
+            tree = compile(statement_src, '<hypothesis>', 'exec', ast.PyCF_ONLY_AST)
+            compile(tree, '<hypothesis>', 'exec')
+        except (SyntaxError, ValueError):
+            return SYNTAX_ERROR
+        if self.check_names and self.get_unbound_names(tree, statement_src, position):
+            return UNBOUND_NAME
+        return None
+
+    def get_statement_range(self, position: int) -> Tuple[int, int]:
+        """ This method returns the lines of the top-level statement that holds a line.
+
+        The whole model is returned if the line is not in a statement.
+
+        :param position: The line number.
+        :type  position: int
+        :rtype: Tuple[int, int]
+        """
+        for (start, end) in self.top_level_ranges:
+            if start <= position <= end:
+                return (start, end)
+        return (1, len(self.model_src))
+
+    def get_unbound_names(self, tree: ast.Module, statement_src: str, position: int) -> Set[str]:
+        """ This method returns the names loaded in a line that are not bound in its scope.
+
+        :param tree: The AST of the patched statement.
+        :type  tree: ast.Module
+        :param statement_src: The source code of the patched statement.
+        :type  statement_src: str
+        :param position: The line number of the hypothesis.
+        :type  position: int
+        :rtype: Set[str]
+        """
+        loaded_names = set()
+        line_bound_names = set()
+        for node in ast.walk(tree):
+            if getattr(node, 'lineno', None) != position:
+                continue
+            if isinstance(node, ast.Name):
+                if isinstance(node.ctx, ast.Load):
+                    loaded_names.add(node.id)
+                else:
+                    line_bound_names.add(node.id)
+            elif isinstance(node, ast.arg):
+                line_bound_names.add(node.arg)
+        loaded_names -= line_bound_names
+        if not loaded_names:
+            return set()
+        scope = ModelIndex.get_scope_chain(tree, statement_src, position)[-1]
+        unbound_names = set()
+        for name in loaded_names:
+            if name in self.module_names or (name.startswith('__') and name.endswith('__')):
+                continue
+            try:
+                symbol = scope.lookup(name)
+            except KeyError:
+                continue
+            if symbol.is_local() or symbol.is_parameter() or symbol.is_free():
+                continue
+            unbound_names.add(name)
+        return unbound_names
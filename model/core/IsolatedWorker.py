@@ -0,0 +1,159 @@
+"""
+This module contains the IsolatedWorker class.
+This class is in charge of executing a function in a forked
+process under memory and CPU limits, so a runaway model cannot
+take down the whole debugging session.
+"""
+import logging
+import multiprocessing
+import os
+import resource
+from typing import Any, Callable, List
+
+class WorkerCrashed(Exception):
+    """ This exception is raised when the isolated worker dies before returning.
+
+    It happens when the worker exceeds its CPU limit (SIGXCPU)
+    or it is killed by the operating system (e.g. out of memory).
+    """
+    pass
+
+class LogCollector(logging.Handler):
+    """ This class keeps the log records emitted in the isolated worker.
+
+    The records are sent back to the parent process, which handles them,
+    so the worker never logs through the parent's handlers (e.g. the Qt
+    signal emitters of the GUI, which are not safe to use after a fork).
+    """
+    records: List[logging.LogRecord]
+
+    def __init__(self) -> None:
+        """ Constructor Method """
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """ This method keeps a picklable copy of the log record.
+
+        :param record: The log record.
+        :type  record: logging.LogRecord
+        """
+        if self.records and self.records[-1] is record:
+            return  # The record was propagated to an ancestor logger.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+class IsolatedWorker():
+    """ This class executes a function in a child process with resource limits.
+
+    The memory limit is the address space the child may allocate on top of
+    what it inherits from the debugging process, and the CPU limit is the
+    processor time (in seconds) the child may use. A limit of 0 means unlimited.
+    The child is forked, thus the function and its arguments are not pickled,
+    only its return value is sent back to the parent process.
+    The child may be forked from any thread (e.g. the GUI's QThread): it only
+    runs the function, and its log records are collected instead of being
+    handled by the inherited handlers, then handled by the parent process.
+    """
+    memory_limit: int
+    cpu_limit: int
+
+    def __init__(self, memory_limit: int = 0, cpu_limit: int = 0) -> None:
+        """ Constructor Method """
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+
+    def run(self, function: Callable, *args: Any) -> Any:
+        """ This method returns the value returned by the function executed in the worker.
+
+        :param function: The function to be executed.
+        :type  function: Callable
+        :param args: The function's arguments.
+        :type  args: Any
+        :rtype: Any
+        """
+        context = multiprocessing.get_context('fork')
+        (parent_conn, child_conn) = context.Pipe(duplex=False)
+        process = context.Process(target=self.work, args=(child_conn, function, args), daemon=True)
+        process.start()
+        child_conn.close()
+        try:
+            (is_returned, result, log_records) = parent_conn.recv()
+        except EOFError:
+            process.join()
+            raise WorkerCrashed(f'The isolated worker died with exit code {process.exitcode}.')
+        finally:
+            parent_conn.close()
+        process.join()
+        self.handle_log_records(log_records)
+        if not is_returned:
+            raise WorkerCrashed(f'The isolated worker raised {result}.')
+        return result
+
+    def work(self, conn: Any, function: Callable, args: Any) -> None:
+        """ This method is the entry point of the child process.
+
+        :param conn: The connection to send the result through.
+        :type  conn: Connection
+        :param function: The function to be executed.
+        :type  function: Callable
+        :param args: The function's arguments.
+        :type  args: Any
+        """
+        log_collector = self.collect_log_records()
+        self.set_limits()
+        try:
+            result = (True, function(*args))
+        except BaseException as e:
+            result = (False, repr(e))
+        conn.send((*result, log_collector.records))
+        conn.close()
+
+    @staticmethod
+    def collect_log_records() -> LogCollector:
+        """ This method replaces the handlers of the current process' loggers by a log collector.
+
+        :rtype: LogCollector
+        """
+        log_collector = LogCollector()
+        loggers = [logging.getLogger()] + [logger for logger in logging.Logger.manager.loggerDict.values()
+                                           if isinstance(logger, logging.Logger)]
+        for logger in loggers:
+            if logger.handlers:
+                logger.handlers = [log_collector]
+        return log_collector
+
+    @staticmethod
+    def handle_log_records(log_records: List[logging.LogRecord]) -> None:
+        """ This method handles the log records collected in the worker with the current process' loggers.
+
+        :param log_records: The log records collected in the worker.
+        :type  log_records: List[logging.LogRecord]
+        """
+        for record in log_records:
+            logging.getLogger(record.name).handle(record)
+
+    def set_limits(self) -> None:
+        """ This method sets the resource limits of the current process. """
+        if self.memory_limit:
+            address_space = self.get_address_space_size() + self.memory_limit
+            resource.setrlimit(resource.RLIMIT_AS, (address_space, address_space))
+        if self.cpu_limit:
+            # The soft limit sends SIGXCPU, which terminates the process.
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_limit, self.cpu_limit + 1))
+
+    @staticmethod
+    def get_address_space_size() -> int:
+        """ This method returns the virtual memory size (in bytes) of the current process.
+        :rtype: int
+        """
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                no_pages = int(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return 0
+        return no_pages * os.sysconf('SC_PAGE_SIZE')
@@ -0,0 +1,237 @@
+"""
+This module contains the ModelSnapshot class.
+This class is in charge of saving the global state of a model
+right after its module-level code was executed, so the state can be
+restored later instead of executing the whole model again.
+"""
+from copy import deepcopy
+from types import (BuiltinFunctionType, CellType, FunctionType, GetSetDescriptorType,
+                   MemberDescriptorType, ModuleType)
+from typing import Any, Callable, Dict, List
+import controller.AbinLogging as AbinLogging
+
+class ModelSnapshot():
+    """ This class represents the globals of an executed model.
+
+    The functions and classes defined in the model are rebuilt when the
+    snapshot is taken and when it is restored, along with their mutable state
+    (e.g. default arguments, class attributes), as a new execution of the model
+    would do. The other mutable globals are deep-copied with the same memo,
+    so they keep referencing the rebuilt functions and classes (e.g. the
+    instances of a model's class are instances of the rebuilt class).
+    The immutable globals and the objects that are not defined in the model
+    are shared on purpose: the imported modules (and their state, e.g. the
+    generator of `random`) are shared by a new execution as well, since
+    they are cached in `sys.modules`. The objects that cannot be copied
+    are also shared. The snapshot is restored into the namespace of the
+    same module object, since the model's functions keep a reference to it.
+    """
+    ATOMIC_TYPES = (int, float, complex, bool, str, bytes, type(None), type(Ellipsis),
+                    range, FunctionType, BuiltinFunctionType, type, ModuleType)
+    # The attributes of a class that are created along with the class.
+    CLASS_DESCRIPTORS = (MemberDescriptorType, GetSetDescriptorType)
+    CLASS_INTERNALS = ('__dict__', '__weakref__', '__abstractmethods__', '_abc_impl')
+    module: ModuleType
+    state: Dict[str, Any]
+
+    def __init__(self, module: ModuleType) -> None:
+        """ Constructor Method """
+        self.module = module
+        self.state = self.copy_state(vars(module), vars(module))
+
+    @classmethod
+    def is_immutable(cls, obj: Any) -> bool:
+        """ This method checks if an object (and all its elements) is immutable.
+
+        :param obj: The object to be checked.
+        :type  obj: Any
+        :rtype: bool
+        """
+        if isinstance(obj, cls.ATOMIC_TYPES):
+            return True
+        if type(obj) in (tuple, frozenset):
+            return all(map(cls.is_immutable, obj))
+        return False
+
+    @classmethod
+    def copy_state(cls, namespace: Dict[str, Any], model_globals: Dict[str, Any]) -> Dict[str, Any]:
+        """ This method returns a copy of a namespace where the model's definitions are rebuilt
+        and only the mutable values are copied.
+
+        The dunder names (e.g., `__builtins__`) belong to the interpreter and are shared.
+        A single memo is used, so the globals that share an object keep sharing it.
+        The definitions are rebuilt first, their state is copied once all of them
+        exist, so it can reference any of them.
+
+        :param namespace: The namespace of a model.
+        :type  namespace: Dict[str, Any]
+        :param model_globals: The namespace the rebuilt functions are bound to.
+        :type  model_globals: Dict[str, Any]
+        :rtype: Dict[str, Any]
+        """
+        memo = {}
+        pending = []
+        model_name = namespace.get('__name__', None)
+        for name, value in namespace.items():
+            if not name.startswith('__'):
+                cls.copy_definition(value, model_globals, model_name, memo, pending)
+        for copy_pending in pending:
+            copy_pending()
+        state = {}
+        for name, value in namespace.items():
+            if name.startswith('__'):
+                state[name] = value
+            else:
+                state[name] = cls.copy_value(value, memo, name)
+        return state
+
+    @classmethod
+    def copy_value(cls, value: Any, memo: Dict[int, Any], name: str = None) -> Any:
+        """ This method returns a deep copy of a value, the immutable values are shared.
+
+        :param value: The value to be copied.
+        :type  value: Any
+        :param memo: The objects already copied, by id.
+        :type  memo: Dict[int, Any]
+        :param name: The name of the value, for logging purposes.
+        :type  name: str
+        :rtype: Any
+        """
+        if id(value) in memo:
+            return memo[id(value)]
+        if cls.is_immutable(value):
+            return value
+        try:
+            return deepcopy(value, memo)
+        except Exception:
+            AbinLogging.debugging_logger.debug(f'The global {name} cannot be copied, it is shared.')
+            return value
+
+    @classmethod
+    def copy_definition(cls, value: Any, model_globals: Dict[str, Any], model_name: str,
+        memo: Dict[int, Any], pending: List[Callable[[], None]]) -> Any:
+        """ This method returns a rebuilt copy of a function or class defined in the model.
+
+        The other values are returned as they are. The state of the copies
+        is copied later, by the callables added to `pending`.
+
+        :param value: The value to be copied.
+        :type  value: Any
+        :param model_globals: The namespace the rebuilt functions are bound to.
+        :type  model_globals: Dict[str, Any]
+        :param model_name: The name of the model's module.
+        :type  model_name: str
+        :param memo: The objects already copied, by id.
+        :type  memo: Dict[int, Any]
+        :param pending: The callables that copy the state of the copies.
+        :type  pending: List[Callable[[], None]]
+        :rtype: Any
+        """
+        if id(value) in memo:
+            return memo[id(value)]
+        if isinstance(value, FunctionType) and value.__globals__ is model_globals:
+            return cls.copy_function(value, model_globals, memo, pending)
+        if isinstance(value, type) and value.__module__ == model_name:
+            return cls.copy_class(value, model_globals, model_name, memo, pending)
+        return value
+
+    @classmethod
+    def copy_function(cls, func: FunctionType, model_globals: Dict[str, Any],
+        memo: Dict[int, Any], pending: List[Callable[[], None]]) -> FunctionType:
+        """ This method returns a new function with the same code as a model's function.
+
+        :param func: The model's function.
+        :type  func: FunctionType
+        :param model_globals: The namespace the new function is bound to.
+        :type  model_globals: Dict[str, Any]
+        :param memo: The objects already copied, by id.
+        :type  memo: Dict[int, Any]
+        :param pending: The callables that copy the state of the copies.
+        :type  pending: List[Callable[[], None]]
+        :rtype: FunctionType
+        """
+        closure = None
+        if func.__closure__ is not None:
+            closure = tuple(CellType() for cell in func.__closure__)
+        new_func = FunctionType(func.__code__, model_globals, func.__name__, None, closure)
+        memo[id(func)] = new_func
+        new_func.__qualname__ = func.__qualname__
+        new_func.__module__ = func.__module__
+        new_func.__doc__ = func.__doc__
+        new_func.__annotations__ = func.__annotations__
+
+        def copy_function_state() -> None:
+            new_func.__defaults__ = cls.copy_value(func.__defaults__, memo, func.__qualname__)
+            new_func.__kwdefaults__ = cls.copy_value(func.__kwdefaults__, memo, func.__qualname__)
+            new_func.__dict__.update(cls.copy_value(func.__dict__, memo, func.__qualname__))
+            for new_cell, cell in zip(closure or (), func.__closure__ or ()):
+                try:
+                    new_cell.cell_contents = cls.copy_value(cell.cell_contents, memo, func.__qualname__)
+                except ValueError:
+                    pass  # The cell is empty.
+        pending.append(copy_function_state)
+        return new_func
+
+    @classmethod
+    def copy_class(cls, model_class: type, model_globals: Dict[str, Any], model_name: str,
+        memo: Dict[int, Any], pending: List[Callable[[], None]]) -> type:
+        """ This method returns a new class with the same definition as a model's class.
+
+        The class is created with its (rebuilt) methods, the other attributes
+        are copied later. A class that cannot be rebuilt (e.g. an enumeration) is shared.
+
+        :param model_class: The model's class.
+        :type  model_class: type
+        :param model_globals: The namespace the rebuilt methods are bound to.
+        :type  model_globals: Dict[str, Any]
+        :param model_name: The name of the model's module.
+        :type  model_name: str
+        :param memo: The objects already copied, by id.
+        :type  memo: Dict[int, Any]
+        :param pending: The callables that copy the state of the copies.
+        :type  pending: List[Callable[[], None]]
+        :rtype: type
+        """
+        copy = lambda value: cls.copy_definition(value, model_globals, model_name, memo, pending)
+        attrs = {}
+        class_state = {}
+        for name, value in vars(model_class).items():
+            if name in cls.CLASS_INTERNALS or isinstance(value, cls.CLASS_DESCRIPTORS):
+                continue
+            if isinstance(value, (FunctionType, type)):
+                attrs[name] = copy(value)
+            elif isinstance(value, (staticmethod, classmethod)):
+                attrs[name] = type(value)(copy(value.__func__))
+            elif isinstance(value, property):
+                attrs[name] = property(copy(value.fget), copy(value.fset), copy(value.fdel), value.__doc__)
+            elif name == '__slots__' or (name.startswith('__') and cls.is_immutable(value)):
+                attrs[name] = value
+            else:
+                class_state[name] = value
+        try:
+            bases = tuple(map(copy, model_class.__bases__))
+            new_class = type(model_class)(model_class.__name__, bases, attrs)
+        except Exception:
+            AbinLogging.debugging_logger.debug(f'The class {model_class.__qualname__} cannot be rebuilt, it is shared.')
+            memo[id(model_class)] = model_class
+            return model_class
+        memo[id(model_class)] = new_class
+
+        def copy_class_state() -> None:
+            for name, value in class_state.items():
+                try:
+                    setattr(new_class, name, cls.copy_value(value, memo, f'{model_class.__qualname__}.{name}'))
+                except (AttributeError, TypeError):
+                    pass  # The attribute is created along with the class.
+        pending.append(copy_class_state)
+        return new_class
+
+    def restore(self) -> ModuleType:
+        """ This method restores the saved state into the module's namespace.
+        :rtype: ModuleType
+        """
+        namespace = vars(self.module)
+        state = self.copy_state(self.state, namespace)
+        namespace.clear()
+        namespace.update(state)
+        return self.module
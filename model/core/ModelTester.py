@@ -4,11 +4,19 @@ The ModelLoader class in charge of converting the models into ModuleType objects
 The ModelTester class in charge of automatically test a model.
 """
 from model.core.AbinDebugger import Debugger, AbinDebugger, InfluencePath
-from types import FunctionType, ModuleType, TracebackType
-from typing import Tuple, TypeVar, Type, Union, Optional, Any, List
+from model.core.OutputComparator import OutputComparator
+from model.core.TestScheduler import TestScheduler
+from model.core.ExecutionBudget import ExecutionBudget, BudgetInstrumenter
+from model.core.ModelSnapshot import ModelSnapshot
+from types import CodeType, FunctionType, ModuleType, TracebackType
+from typing import Tuple, TypeVar, Type, Union, Optional, Any, List, Dict, Set
+import ast
 import controller.AbinLogging as AbinLogging
 import controller.DebugController as DebugController
+import logging
 import signal
+import sys
+from time import perf_counter
 signal.signal(signal.SIGALRM, DebugController.test_timeout_handler)
 
 Test = Any
@@ -21,6 +29,7 @@ ExpectedOutput = Any
 TestCase = Tuple[Test, ExpectedOutput, InputArgs]
 TestSuite = List[TestCase]
 Observation = List[TestResult]
+CoverageIndex = Dict[int, Set[int]]
 
 from importlib.abc import SourceLoader
 from importlib.util import module_from_spec, spec_from_loader
@@ -29,10 +38,30 @@ class ModelLoader(SourceLoader):
     This class is a helper class to convert the models into ModuleType objects
     in order to test them.
     """
+    budget: Union[ExecutionBudget, None]
+
     def __init__(self, src_code: Union[List[str], str]) -> None:
         """ Constructor Method """
         SourceLoader.__init__(self)
         self.src_code = ''.join(src_code)
+        self.budget = None
+
+    def source_to_code(self, data: bytes, path: str):
+        """ This method compiles the source code of the ModuleType object.
+
+        If an execution budget is given, the loops and functions
+        of the model are instrumented to consume it.
+
+        :param data: The source code of the ModuleType object.
+        :type  data: bytes
+        :param path: The name of the ModuleType object.
+        :type  path: str
+        :rtype: CodeType
+        """
+        if self.budget is None:
+            return super().source_to_code(data, path)
+        tree = BudgetInstrumenter().instrument(ast.parse(data))
+        return compile(tree, path, 'exec', dont_inherit=True)
 
     def get_data(self, path: str = None) -> bytes:
         """ Abstract method implementation.
@@ -68,8 +97,102 @@ class ModelLoader(SourceLoader):
         return super().get_source(self.fullname)
 
 
+class TestBaseline():
+    """ This class holds what was observed while testing a model version.
+
+    The baseline is the observation of the test suite along with the
+    coverage index, i.e., a mapping from every executed line of the model
+    to the identifiers of the test cases that executed it, the
+    wall time (in seconds) that every test case took and, in the execution
+    budget mode, the execution steps that every test case used.
+    In the module snapshot mode, it also holds the model's globals.
+    """
+    observation: Observation
+    coverage_index: CoverageIndex
+    durations: Dict[int, float]
+    steps: Dict[int, int]
+    snapshot: Union[ModelSnapshot, None]
+    max_duration: Union[float, None]
+    max_steps: Union[int, None]
+
+    def __init__(self, observation: Observation, coverage_index: CoverageIndex,
+                durations: Dict[int, float] = None, steps: Dict[int, int] = None,
+                snapshot: ModelSnapshot = None) -> None:
+        """ Constructor Method """
+        self.observation = observation
+        self.coverage_index = coverage_index
+        self.durations = {} if durations is None else durations
+        self.steps = {} if steps is None else steps
+        self.snapshot = snapshot
+        self.max_duration = self.get_suite_maximum(self.durations)
+        self.max_steps = self.get_suite_maximum(self.steps)
+
+    def get_covering_tests(self, line_no: int) -> Union[Set[int], None]:
+        """ This method returns the test cases that executed the given line.
+
+        A line that was not executed by any test case (e.g. a module-level
+        statement) may influence all of them, thus None is returned.
+
+        :param line_no: The line number in the model.
+        :type  line_no: int
+        :rtype: Union[Set[int], None]
+        """
+        return self.coverage_index.get(line_no, None)
+
+    def has_passed(self, test_case_id: int) -> bool:
+        """ This method checks if a test case passed in the baseline.
+
+        :param test_case_id: The test case identifier.
+        :type  test_case_id: int
+        :rtype: bool
+        """
+        if test_case_id >= len(self.observation):
+            return False
+        return self.observation[test_case_id][1] == PassedTest
+
+    def get_suite_maximum(self, measures: Dict[int, float]) -> Union[float, None]:
+        """ This method returns the maximum measure (e.g. wall time) of the passed test cases.
+
+        If no test case passed, the maximum of all the test cases is returned,
+        None means that there are no measures.
+
+        :param measures: The measure of every test case.
+        :type  measures: Dict[int, float]
+        :rtype: Union[float, None]
+        """
+        passed_measures = [measure for test_case_id, measure in measures.items()
+                           if self.has_passed(test_case_id)]
+        if passed_measures:
+            return max(passed_measures)
+        return max(measures.values(), default=None)
+
+    def get_reference(self, measures: Dict[int, float], suite_maximum: Union[float, None],
+        test_case_id: int) -> Union[float, None]:
+        """ This method returns the measure the resources of a test case are calibrated from.
+
+        A test case that passed is calibrated from its own measure. A test case
+        that failed may have stopped early (e.g. on an exception), thus it is
+        calibrated from the largest of its own measure and the suite's maximum.
+        None means that there are no measures.
+
+        :param measures: The measure of every test case.
+        :type  measures: Dict[int, float]
+        :param suite_maximum: The suite's maximum measure (see get_suite_maximum).
+        :type  suite_maximum: Union[float, None]
+        :param test_case_id: The test case identifier.
+        :type  test_case_id: int
+        :rtype: Union[float, None]
+        """
+        measure = measures.get(test_case_id, None)
+        if measure is not None and self.has_passed(test_case_id):
+            return measure
+        return max((x for x in (measure, suite_maximum) if x is not None), default=None)
+
+
 class ModelTester(ModelLoader):
     """ This class is used to automatically test a model  """
+    # In the module snapshot mode, the globals of the executed model are saved for the baseline.
+    TAKES_SNAPSHOT: bool = True
     src_code: Union[List[str], str]
     target_function: str
     test_suite: TestSuite
@@ -77,14 +200,24 @@ class ModelTester(ModelLoader):
     func: Union[FunctionType, None]
     influence_path: InfluencePath
     observation: Observation
+    coverage_index: CoverageIndex
+    test_durations: Dict[int, float]
+    test_steps: Dict[int, int]
+    interrupted_tests: Set[int]
+    is_stopped_early: bool
+    baseline: Union[TestBaseline, None]
+    scheduler: Union[TestScheduler, None]
+    snapshot: Union[ModelSnapshot, None]
     debugger: Debugger
     susp_threshold: int
+    comparator: OutputComparator
 
     def __init__(self, src_code: Union[List[str], str], 
                 target_function: str,
                 test_suite: TestSuite,
                 susp_threshold: int = 0,
-                debugger: Debugger = AbinDebugger) -> None:
+                debugger: Debugger = AbinDebugger,
+                comparator: Optional[OutputComparator] = None) -> None:
         """ Constructor Method """
         AbinLogging.debugging_logger.debug('Init ModelTester')
         super().__init__(src_code)
@@ -94,9 +227,22 @@ class ModelTester(ModelLoader):
         self.model = None
         self.influence_path = []
         self.observation = []
+        self.coverage_index = {}
+        self.test_durations = {}
+        self.baseline = None
+        self.scheduler = None
+        self.snapshot = None
         self.prev_observation = None
         self.debugger = debugger
         self.susp_threshold = susp_threshold
+        if comparator is None:
+            comparator = OutputComparator(test_suite)
+        self.comparator = comparator
+        self.test_steps = {}
+        self.interrupted_tests = set()
+        self.is_stopped_early = False
+        if DebugController.EXECUTION_BUDGET_MODE:
+            self.budget = ExecutionBudget()
 
     def __enter__(self) -> Any:
         """ A context manager method is used to initialize
@@ -104,8 +250,22 @@ class ModelTester(ModelLoader):
         AbinLogging.debugging_logger.debug('Entering ModelTester')
         spec = spec_from_loader(name='model_in_test', loader=self) # The class itself contains the loader
         self.model = module_from_spec(spec)
+        snapshot_patch = self.get_snapshot_patch()
+        if snapshot_patch is not None:
+            # The module-level code is not executed again, the saved globals are restored.
+            module_attrs = vars(self.model)
+            self.model = self.baseline.snapshot.restore()
+            vars(self.model).update(module_attrs)
+        if self.budget is not None:
+            self.budget.reset()
+            setattr(self.model, BudgetInstrumenter.BUDGET_NAME, self.budget)
         try:
-            spec.loader.exec_module(self.model)
+            if snapshot_patch is None:
+                spec.loader.exec_module(self.model)
+                if DebugController.MODULE_SNAPSHOT_MODE and self.TAKES_SNAPSHOT:
+                    self.snapshot = ModelSnapshot(self.model)
+            else:
+                exec(snapshot_patch, vars(self.model))
         except Exception:
             AbinLogging.debugging_logger.exception(
                 f'An error ocurred while importing the model {self.model.__name__}'
@@ -152,7 +312,8 @@ class ModelTester(ModelLoader):
             AbinLogging.debugging_logger.debug(f"{format_exc()}")
         return True  # Ignore exception, if any
 
-    def model_testing(self, check_consistency: bool = False) -> Tuple[Observation, InfluencePath]:
+    def model_testing(self, check_consistency: bool = False,
+        test_case_ids: Optional[Set[int]] = None) -> Tuple[Observation, InfluencePath]:
         """ This method, returns an observation of the executed test cases and an influence path.
         
         This method test all the test cases against the provided model.
@@ -163,16 +324,41 @@ class ModelTester(ModelLoader):
         :param check_consistency: A control variable to enter
         to the check_result_consistency method.
         :type  check_consistency: bool
+        :param test_case_ids: The test cases to be executed, the outcomes of the
+        other test cases are kept from the last observation. None means all of them.
+        :type  test_case_ids: Optional[Set[int]]
         :rtype: Tuple[Observation, InfluencePath]
         """
         new_observation: Observation = [('UndefinedTest', FailedTest) for i in range(len(self.test_suite))]
         test_result: ExpectedOutput
         debugger: Debugger = self.debugger(susp_threshold=self.susp_threshold)
+        func_names = set(debugger.get_all_func_names(self.model)) if self.model else set()
+        impacted_tests = self.get_impacted_tests()
+        if test_case_ids is None:
+            self.coverage_index = {}
+            self.test_durations = {}
+            self.test_steps = {}
+            self.interrupted_tests = set()
+            self.is_stopped_early = False
+        test_cases = list(self.test_suite.itertuples())
         AbinLogging.debugging_logger.info(f"Starting Model Testing...")
-        for i, test_case, expected_output, *input_args in self.test_suite.itertuples():
+        for i in self.get_test_order():
+            (_, test_case, expected_output, *input_args) = test_cases[i]
+            if test_case_ids is not None and i not in test_case_ids:
+                if self.observation:
+                    new_observation[i] = self.observation[i]
+                continue
+            if impacted_tests is not None and i not in impacted_tests:
+                # The test case cannot be affected, its outcome is kept.
+                new_observation[i] = self.baseline.observation[i]
+                continue
             AbinLogging.debugging_logger.info(f"Testing {test_case}...")
+            start_time = perf_counter()
+            test_timeout = self.get_test_timeout(i)
+            if self.budget is not None:
+                self.budget.reset(self.get_step_budget(i))
             with debugger:
-                signal.setitimer(signal.ITIMER_REAL, DebugController.TEST_TIMEOUT)
+                signal.setitimer(signal.ITIMER_REAL, test_timeout)
                 if self.func is None:
                     raise ImportError(f"""
                         Failed to import the given function {self.target_function} from the model {self.model.__name__}.
@@ -180,28 +366,49 @@ class ModelTester(ModelLoader):
                         """
                     )
                 test_result = self.func(*input_args)
-                AbinLogging.debugging_logger.debug(f"""
-                    test_result == expected_output
-                    {str(test_result)} == {str(expected_output)}?
-                    """
-                )
-                if str(test_result) == str(expected_output):
+                # Only the model is traced, the comparison runs untraced.
+                trace_function = sys.gettrace()
+                sys.settrace(None)
+                try:
+                    if AbinLogging.debugging_logger.isEnabledFor(logging.DEBUG):
+                        AbinLogging.debugging_logger.debug(f"""
+                            test_result == expected_output
+                            {str(test_result)} == {str(expected_output)}?
+                            """
+                        )
+                    is_passed = self.comparator.compare(i, test_result)
+                finally:
+                    sys.settrace(trace_function)
+                if is_passed:
                     new_observation[i] = (test_case, PassedTest)
                 else:
                     new_observation[i] = (test_case, FailedTest)
-                    raise AssertionError(f"""
-                        The result and the expected output are not equal.
-                        Result: {test_result}
-                        Expected: {expected_output}
-                        """
+                    # The result is not formatted, it may be a huge structure.
+                    raise AssertionError(
+                        f"The result and the expected output of {test_case} are not equal."
                     )
 
+            # The timer ran out or the budget was exceeded, the outcome depends on the test's resources.
+            if (signal.getitimer(signal.ITIMER_REAL)[0] == 0
+                or (self.budget is not None and self.budget.remaining < 0)):
+                self.interrupted_tests.add(i)
             signal.setitimer(signal.ITIMER_REAL, 0)
+            elapsed_time = perf_counter() - start_time
+            self.test_durations[i] = elapsed_time
+            if self.budget is not None:
+                self.test_steps[i] = self.budget.used_steps
+            self.index_coverage(i, debugger.collector.events(), func_names)
+            if self.scheduler is not None:
+                self.scheduler.record_run(i, elapsed_time)
             if check_consistency and new_observation[i][1] == FailedTest:
                 AbinLogging.debugging_logger.debug('check_consistency')
                 is_consistent_ = self.check_result_consistency(new_observation[i], i)
                 if not is_consistent_:
                     AbinLogging.debugging_logger.debug('break for test inconsistency')
+                    # The remaining test cases depend on the test order, they are not executed.
+                    self.is_stopped_early = True
+                    if self.scheduler is not None:
+                        self.scheduler.record_kill(i)
                     break
         
         AbinLogging.debugging_logger.info(f"Model Test Finished...")
@@ -211,6 +418,93 @@ class ModelTester(ModelLoader):
             self.influence_path = debugger.get_influence_path(self.model, self.func)
         return (self.observation, self.influence_path)
 
+    def index_coverage(self, test_case_id: int, events: Set[Tuple[str, int]],
+                    func_names: Set[str]) -> None:
+        """ This method adds the lines executed by a test case to the coverage index.
+
+        Only the events of the model's functions are indexed.
+
+        :param test_case_id: Current test case identifier.
+        :type  test_case_id: int
+        :param events: The (function name, line number) events of the test case.
+        :type  events: Set[Tuple[str, int]]
+        :param func_names: The names of the model's functions.
+        :type  func_names: Set[str]
+        """
+        for func_name, line_no in events:
+            if func_name in func_names:
+                self.coverage_index.setdefault(line_no, set()).add(test_case_id)
+
+    @property
+    def is_interrupted(self) -> bool:
+        """ This property represents whether a test case was stopped by a timeout or an execution budget. """
+        return len(self.interrupted_tests) > 0
+
+    @property
+    def is_complete(self) -> bool:
+        """ This property represents whether every selected test case was executed to its end,
+        i.e., the observation does not depend on the test order nor on the test's resources. """
+        return not self.is_interrupted and not self.is_stopped_early
+
+    def get_test_order(self) -> List[int]:
+        """ This method returns the order in which the test cases are executed.
+
+        The test suite's order is kept unless a scheduler is given.
+
+        :rtype: List[int]
+        """
+        test_case_ids = range(len(self.test_suite))
+        if self.scheduler is None:
+            return list(test_case_ids)
+        return self.scheduler.order(test_case_ids)
+
+    def get_test_timeout(self, test_case_id: int) -> float:
+        """ This method returns the timeout (in seconds) of a test case.
+
+        :param test_case_id: Current test case identifier.
+        :type  test_case_id: int
+        :rtype: float
+        """
+        return DebugController.TEST_TIMEOUT
+
+    def get_step_budget(self, test_case_id: int) -> Union[int, None]:
+        """ This method returns the execution steps available to a test case.
+
+        None means that the number of steps is unlimited.
+
+        :param test_case_id: Current test case identifier.
+        :type  test_case_id: int
+        :rtype: Union[int, None]
+        """
+        return None
+
+    def get_snapshot_patch(self) -> Union[CodeType, None]:
+        """ This method returns the code to execute on top of the baseline's snapshot.
+
+        None means that the whole model must be executed.
+        To be overloaded in subclasses.
+
+        :rtype: Union[CodeType, None]
+        """
+        return None
+
+    def get_impacted_tests(self) -> Union[Set[int], None]:
+        """ This method returns the test cases that must be executed.
+
+        None means that the whole test suite must be executed.
+        To be overloaded in subclasses.
+
+        :rtype: Union[Set[int], None]
+        """
+        return None
+
+    def get_baseline(self) -> TestBaseline:
+        """ This method returns the baseline observed in the last model test.
+        :rtype: TestBaseline
+        """
+        return TestBaseline(self.observation, self.coverage_index,
+            self.test_durations, self.test_steps, self.snapshot)
+
     def run_test(self, input_args) -> ExpectedOutput:
         """ Dummy method for futher implementations """
         return self.func(*input_args)
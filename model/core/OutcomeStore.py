@@ -0,0 +1,161 @@
+"""
+This module contains the OutcomeStore class.
+This class is in charge of persisting the outcome of the tested hypotheses
+across debugging sessions, so the same hypothesis model is not tested twice.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, List, Tuple, Union
+from model.core.ModelTester import Observation, PassedTest, FailedTest
+
+StoreKey = Tuple[str, str, str]
+StoredOutcome = Tuple[str, Observation, float]
+
+class OutcomeStore():
+    """ This class is a content-addressed store of hypotheses outcomes.
+
+    The outcomes are kept in a local SQLite file and are addressed by the
+    hash of the (normalized) hypothesis model source, the hash of the
+    test suite and the hash of the testing policy (timeouts and the
+    observation the hypothesis is compared to). The least recently used
+    outcomes are evicted once the store holds more than `max_entries`.
+    """
+    db_path: Path
+    max_entries: int
+
+    def __init__(self, db_path: Union[str, Path], max_entries: int = 100000) -> None:
+        """ Constructor Method """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(str(self.db_path), isolation_level=None)
+        # The store is a cache, losing the last writes on a crash is harmless.
+        self.connection.execute('PRAGMA synchronous = OFF')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS outcomes (
+                model_hash TEXT NOT NULL,
+                suite_hash TEXT NOT NULL,
+                policy_hash TEXT NOT NULL,
+                behavior TEXT NOT NULL,
+                observation TEXT NOT NULL,
+                explanatory_power REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model_hash, suite_hash, policy_hash)
+            )"""
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS outcomes_last_access ON outcomes (last_access)'
+        )
+
+    @staticmethod
+    def hash_model(src_code: Union[List[str], str]) -> str:
+        """ This method returns the hash of the normalized source code of a model.
+
+        The trailing whitespaces and the blank lines are not considered.
+
+        :param src_code: The source code of the model.
+        :type  src_code: Union[List[str], str]
+        :rtype: str
+        """
+        if isinstance(src_code, str):
+            src_code = src_code.splitlines()
+        normalized_src = '\n'.join(line.rstrip() for line in src_code if line.strip())
+        return hashlib.sha256(normalized_src.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_test_suite(test_suite: Any) -> str:
+        """ This method returns the hash of a test suite.
+
+        :param test_suite: The test suite.
+        :type  test_suite: TestSuite
+        :rtype: str
+        """
+        data = test_suite.to_json(orient='split', default_handler=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_policy(*policy: Any) -> str:
+        """ This method returns the hash of the testing policy.
+
+        :param policy: The settings and observations that define the test outcome.
+        :type  policy: Any
+        :rtype: str
+        """
+        return hashlib.sha256(repr(policy).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def encode_observation(observation: Observation) -> str:
+        """ This method encodes an observation as a JSON string.
+
+        :param observation: The observation.
+        :type  observation: Observation
+        :rtype: str
+        """
+        return json.dumps([(str(test), outcome == PassedTest) for test, outcome in observation])
+
+    @staticmethod
+    def decode_observation(data: str) -> Observation:
+        """ This method decodes an observation from a JSON string.
+
+        :param data: The encoded observation.
+        :type  data: str
+        :rtype: Observation
+        """
+        return [(test, PassedTest if passed else FailedTest) for test, passed in json.loads(data)]
+
+    def get(self, key: StoreKey) -> Union[StoredOutcome, None]:
+        """ This method returns the stored outcome of a hypothesis model.
+
+        :param key: The (model, test suite, policy) hashes.
+        :type  key: StoreKey
+        :rtype: Union[StoredOutcome, None]
+        """
+        row = self.connection.execute("""
+            SELECT behavior, observation, explanatory_power FROM outcomes
+            WHERE model_hash = ? AND suite_hash = ? AND policy_hash = ?""", key
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("""
+            UPDATE outcomes SET last_access = ?
+            WHERE model_hash = ? AND suite_hash = ? AND policy_hash = ?""", (time.time(), *key)
+        )
+        (behavior, observation, explanatory_power) = row
+        return (behavior, self.decode_observation(observation), explanatory_power)
+
+    def put(self, key: StoreKey, behavior: str,
+        observation: Observation, explanatory_power: float) -> None:
+        """ This method stores the outcome of a hypothesis model.
+
+        :param key: The (model, test suite, policy) hashes.
+        :type  key: StoreKey
+        :param behavior: The name of the hypothesis' behavior.
+        :type  behavior: str
+        :param observation: The hypothesis' observation.
+        :type  observation: Observation
+        :param explanatory_power: The hypothesis' explanatory power.
+        :type  explanatory_power: float
+        """
+        self.connection.execute("""
+            INSERT OR REPLACE INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (*key, behavior, self.encode_observation(observation), explanatory_power, time.time())
+        )
+        self.evict()
+
+    def evict(self) -> None:
+        """ This method evicts the least recently used outcomes above `max_entries`. """
+        (no_entries,) = self.connection.execute('SELECT COUNT(*) FROM outcomes').fetchone()
+        if no_entries <= self.max_entries:
+            return
+        self.connection.execute("""
+            DELETE FROM outcomes WHERE rowid IN (
+                SELECT rowid FROM outcomes ORDER BY last_access ASC LIMIT ?
+            )""", (no_entries - self.max_entries,)
+        )
+
+    def close(self) -> None:
+        """ This method closes the connection to the store's file. """
+        self.connection.close()
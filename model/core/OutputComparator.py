@@ -0,0 +1,141 @@
+"""
+This module contains the OutputComparator class.
+This class is in charge of deciding if the result of a test case
+is equal to its expected output. The expected outputs are canonicalized
+once per test suite and the results are compared structurally.
+"""
+from ast import literal_eval
+from typing import Any, Dict, Tuple, Union
+
+ExpectedOutput = Any
+TestResult = Any
+CanonicalOutput = Tuple[str, Any]
+
+class OutputComparator():
+    """ This class compares the test results against the expected outputs.
+
+    The test outcome has always been decided by `str(result) == str(expected)`;
+    this class keeps those semantics. The expected output is stringified and
+    evaluated as a Python literal only once per test case, and the result
+    is compared against the literal element by element, so the comparison
+    stops at the first difference instead of stringifying the whole result.
+    Whenever the structural comparison cannot decide, the `str` comparison is used.
+    """
+    # Marker for the expected outputs that are not Python literals.
+    NO_LITERAL = object()
+    # Types whose `str`/`repr` equality can be decided structurally.
+    SCALAR_TYPES = (int, bool, type(None), str)
+    CONTAINER_TYPES = (list, tuple, dict)
+    canonical_outputs: Dict[int, CanonicalOutput]
+
+    def __init__(self, test_suite: Any) -> None:
+        """ Constructor Method """
+        self.test_suite = test_suite
+        self.canonical_outputs = {}
+
+    def get_canonical_output(self, test_case_id: int) -> CanonicalOutput:
+        """ This method returns the cached canonical form of an expected output.
+
+        :param test_case_id: The test case identifier (index in the test suite).
+        :type  test_case_id: int
+        :rtype: CanonicalOutput
+        """
+        if test_case_id not in self.canonical_outputs:
+            expected_output = self.test_suite.iat[test_case_id, 1]
+            self.canonical_outputs[test_case_id] = self.canonicalize(expected_output)
+        return self.canonical_outputs[test_case_id]
+
+    @classmethod
+    def canonicalize(cls, expected_output: ExpectedOutput) -> CanonicalOutput:
+        """ This method returns the canonical form of an expected output.
+
+        The canonical form is a tuple of the stringified expected output
+        and its evaluation as a Python literal. The literal is only kept
+        if its representation is identical to the stringified expected output,
+        e.g. '[1,2]' is not kept since `str([1, 2])` is '[1, 2]'.
+
+        :param expected_output: The expected output of a test case.
+        :type  expected_output: ExpectedOutput
+        :rtype: CanonicalOutput
+        """
+        expected_str = str(expected_output)
+        try:
+            literal = literal_eval(expected_str)
+        except Exception:
+            literal = cls.NO_LITERAL
+        else:
+            if repr(literal) != expected_str:
+                literal = cls.NO_LITERAL
+        return (expected_str, literal)
+
+    def compare(self, test_case_id: int, test_result: TestResult) -> bool:
+        """ This method checks if the result of a test case equals its expected output.
+
+        :param test_case_id: The test case identifier (index in the test suite).
+        :type  test_case_id: int
+        :param test_result: The value returned by the target function.
+        :type  test_result: TestResult
+        :rtype: bool
+        """
+        (expected_str, literal) = self.get_canonical_output(test_case_id)
+        if type(test_result) is str:
+            return test_result == expected_str
+        if literal is not self.NO_LITERAL:
+            is_equal = self.structural_equal(test_result, literal)
+            if is_equal is not None:
+                return is_equal
+        # Fallback to the original CSV semantics.
+        return str(test_result) == expected_str
+
+    @classmethod
+    def structural_equal(cls, result: Any, literal: Any) -> Union[bool, None]:
+        """ This method compares a result against a literal with early exit.
+
+        The comparison is type-strict in order to be equivalent to
+        the comparison of their `repr` strings. If the result holds
+        objects whose string representation is unknown, None is returned.
+
+        :param result: The test result (or one of its elements).
+        :type  result: Any
+        :param literal: The expected literal (or one of its elements).
+        :type  literal: Any
+        :rtype: Union[bool, None]
+        """
+        result_type = type(result)
+        if result_type is float:
+            return type(literal) is float and repr(result) == repr(literal)
+        if result_type in cls.SCALAR_TYPES:
+            return result_type is type(literal) and result == literal
+        if result_type not in cls.CONTAINER_TYPES:
+            return None
+        if result_type is not type(literal) or len(result) != len(literal):
+            # Elements of unknown type may have any representation,
+            # so only plain results can be rejected without the `str` fallback.
+            return False if cls.is_plain(result) else None
+        if result_type is dict:
+            pairs = zip(result.items(), literal.items())
+            elements = ((x, y) for pair in pairs for x, y in zip(*pair))
+        else:
+            elements = zip(result, literal)
+        for result_item, literal_item in elements:
+            is_equal = cls.structural_equal(result_item, literal_item)
+            if not is_equal:
+                return is_equal
+        return True
+
+    @classmethod
+    def is_plain(cls, obj: Any) -> bool:
+        """ This method checks if an object is only composed of builtin literals.
+
+        :param obj: The object to be checked.
+        :type  obj: Any
+        :rtype: bool
+        """
+        obj_type = type(obj)
+        if obj_type is float or obj_type in cls.SCALAR_TYPES:
+            return True
+        if obj_type is dict:
+            return all(cls.is_plain(k) and cls.is_plain(v) for k, v in obj.items())
+        if obj_type in (list, tuple):
+            return all(map(cls.is_plain, obj))
+        return False
@@ -0,0 +1,75 @@
+"""
+This module contains the PatternCache class.
+This class is in charge of keeping the matching patterns retrieved
+from the database during a debugging session, so the bug candidates
+that are unchanged between refinements are not queried again.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Union
+
+class PatternCache():
+    """ This class is a least recently used (LRU) cache of pattern query results.
+
+    The results are keyed by (hexdigest, max_complexity), only the fully
+    retrieved results (lists of patterns, not live database cursors) are kept.
+    The cache is shared with the prefetch thread, thus its operations are synchronized.
+    """
+    capacity: int
+    hits: int
+    misses: int
+
+    def __init__(self, capacity: int = 256) -> None:
+        """ Constructor Method """
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key: Hashable) -> Union[Any, None]:
+        """ This method returns a cached result, None means that it is not cached.
+
+        :param key: The (hexdigest, max_complexity) of the query.
+        :type  key: Hashable
+        :rtype: Union[Any, None]
+        """
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key: Hashable, result: Any) -> None:
+        """ This method caches a result, the least recently used one is evicted if needed.
+
+        :param key: The (hexdigest, max_complexity) of the query.
+        :type  key: Hashable
+        :param result: The query's result.
+        :type  result: Any
+        """
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """ This method checks if a result is cached, the counters are not updated.
+
+        :param key: The (hexdigest, max_complexity) of the query.
+        :type  key: Hashable
+        :rtype: bool
+        """
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self) -> int:
+        """ This method returns the number of cached results.
+        :rtype: int
+        """
+        return len(self.entries)
@@ -0,0 +1,98 @@
+"""
+This module contains the PatternStats class.
+This class is in charge of persisting how often each bug-fix pattern
+was tried and how often it repaired a defect, across debugging sessions.
+"""
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Union
+
+class PatternStats():
+    """ This class is a persistent record of the patterns' repair success.
+
+    The patterns are identified by their bug and fix hexdigests. The success
+    rate is smoothed with one success and one failure a priori, thus an
+    unseen pattern has a success rate of 0.5.
+    """
+    db_path: Path
+
+    # The maximum number of host parameters of a single SQLite query.
+    MAX_QUERY_PARAMS = 500
+
+    def __init__(self, db_path: Union[str, Path]) -> None:
+        """ Constructor Method """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # The stats are also updated by the background hypotheses producer.
+        self.connection = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        self.lock = Lock()
+        # The stats only guide the scheduling, losing the last writes on a crash is harmless.
+        self.connection.execute('PRAGMA synchronous = OFF')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS pattern_stats (
+                pattern_id TEXT PRIMARY KEY,
+                attempts INTEGER NOT NULL,
+                successes INTEGER NOT NULL
+            )"""
+        )
+
+    @staticmethod
+    def get_success_rate(attempts: int, successes: int) -> float:
+        """ This method returns the smoothed success rate of a pattern.
+
+        :param attempts: The number of times the pattern was tried.
+        :type  attempts: int
+        :param successes: The number of times the pattern repaired a defect.
+        :type  successes: int
+        :rtype: float
+        """
+        return (successes + 1) / (attempts + 2)
+
+    def get_success_rates(self, pattern_ids: Iterable[str]) -> Dict[str, float]:
+        """ This method returns the success rate of each given pattern.
+
+        :param pattern_ids: The patterns' ids.
+        :type  pattern_ids: Iterable[str]
+        :rtype: Dict[str, float]
+        """
+        pattern_ids = list(set(pattern_ids))
+        success_rates = { pattern_id: self.get_success_rate(0, 0) for pattern_id in pattern_ids }
+        for i in range(0, len(pattern_ids), self.MAX_QUERY_PARAMS):
+            chunk = pattern_ids[i:i + self.MAX_QUERY_PARAMS]
+            with self.lock:
+                rows = self.connection.execute(f"""
+                    SELECT pattern_id, attempts, successes FROM pattern_stats
+                    WHERE pattern_id IN ({', '.join('?' * len(chunk))})""", chunk
+                ).fetchall()
+            for (pattern_id, attempts, successes) in rows:
+                success_rates[pattern_id] = self.get_success_rate(attempts, successes)
+        return success_rates
+
+    def record_attempt(self, pattern_id: str) -> None:
+        """ This method records that a pattern was tried.
+
+        :param pattern_id: The pattern's id.
+        :type  pattern_id: str
+        """
+        with self.lock:
+            self.connection.execute("""
+                INSERT INTO pattern_stats VALUES (?, 1, 0)
+                ON CONFLICT (pattern_id) DO UPDATE SET attempts = attempts + 1""", (pattern_id,)
+            )
+
+    def record_success(self, pattern_id: str) -> None:
+        """ This method records that a pattern repaired a defect.
+
+        :param pattern_id: The pattern's id.
+        :type  pattern_id: str
+        """
+        with self.lock:
+            self.connection.execute("""
+                INSERT INTO pattern_stats VALUES (?, 1, 1)
+                ON CONFLICT (pattern_id) DO UPDATE SET successes = successes + 1""", (pattern_id,)
+            )
+
+    def close(self) -> None:
+        """ This method closes the connection to the stats' file. """
+        self.connection.close()
@@ -0,0 +1,69 @@
+"""
+This module contains the TestScheduler class.
+This class is in charge of ordering the test cases during
+the hypotheses testing, in order to reject a bad hypothesis
+with as few executed test cases as possible.
+"""
+from typing import Dict, Iterable, List
+
+class TestScheduler():
+    """ This class orders the test cases by their kill rate.
+
+    The kill rate of a test case is the ratio of hypotheses it rejected
+    (i.e., the test case passed in the previous observation and failed
+    with the hypothesis) to the times it was executed. The statistic is
+    updated online during the whole debugging session and smoothed with
+    the Laplace rule, so the test cases that were never executed are tried early.
+    The test cases with the same kill rate are ordered by their mean execution time.
+    """
+    runs: Dict[int, int]
+    kills: Dict[int, int]
+    mean_costs: Dict[int, float]
+
+    def __init__(self) -> None:
+        """ Constructor Method """
+        self.runs = {}
+        self.kills = {}
+        self.mean_costs = {}
+
+    def kill_rate(self, test_case_id: int) -> float:
+        """ This method returns the smoothed kill rate of a test case.
+
+        :param test_case_id: The test case identifier.
+        :type  test_case_id: int
+        :rtype: float
+        """
+        kills = self.kills.get(test_case_id, 0)
+        runs = self.runs.get(test_case_id, 0)
+        return (kills + 1) / (runs + 2)
+
+    def order(self, test_case_ids: Iterable[int]) -> List[int]:
+        """ This method returns the test cases sorted by execution priority.
+
+        :param test_case_ids: The test cases identifiers.
+        :type  test_case_ids: Iterable[int]
+        :rtype: List[int]
+        """
+        return sorted(test_case_ids,
+            key=lambda x: (-self.kill_rate(x), self.mean_costs.get(x, 0.0)))
+
+    def record_run(self, test_case_id: int, elapsed_time: float) -> None:
+        """ This method updates the statistics of an executed test case.
+
+        :param test_case_id: The test case identifier.
+        :type  test_case_id: int
+        :param elapsed_time: The execution time in seconds.
+        :type  elapsed_time: float
+        """
+        runs = self.runs.get(test_case_id, 0) + 1
+        mean_cost = self.mean_costs.get(test_case_id, 0.0)
+        self.runs[test_case_id] = runs
+        self.mean_costs[test_case_id] = mean_cost + (elapsed_time - mean_cost) / runs
+
+    def record_kill(self, test_case_id: int) -> None:
+        """ This method updates the statistics of a test case that rejected a hypothesis.
+
+        :param test_case_id: The test case identifier.
+        :type  test_case_id: int
+        """
+        self.kills[test_case_id] = self.kills.get(test_case_id, 0) + 1
@@ -0,0 +1,112 @@
+"""
+This module manages the process-wide connections to the database.
+One pooled MongoClient is kept per URI, so the connection setup
+and the server selection are paid only once per session.
+"""
+import atexit
+from threading import Lock
+from typing import Dict, Mapping
+from pymongo import MongoClient
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+import controller.AbinLogging as AbinLogging
+import controller.DebugController as DebugController
+
+# The pool size and timeouts used when they are not in the configuration file.
+DEFAULT_POOL_SETTINGS: Dict[str, str] = {
+    'DB_MAX_POOL_SIZE': '10',
+    'DB_CONNECT_TIMEOUT_MS': '2000',
+    'DB_SERVER_SELECTION_TIMEOUT_MS': '2000',
+    'DB_SOCKET_TIMEOUT_MS': '0'
+}
+
+_clients: Dict[str, MongoClient] = {}
+_clients_lock = Lock()
+
+def get_mongo_uri(config: Mapping[str, str] = None) -> str:
+    """ This function builds the database's URI given the configuration.
+
+    :param config: The configuration, the application settings by default.
+    :type  config: Mapping[str, str]
+    :rtype: str
+    """
+    if config is None:
+        config = DebugController.APP_SETTINGS
+    return f"{config['DB_URI']}://{config['DB_HOST']}:{config['DB_PORT']}"
+
+def get_pool_options(config: Mapping[str, str] = None) -> Dict[str, int]:
+    """ This function returns the MongoClient's pool options given the configuration.
+
+    :param config: The configuration, the application settings by default.
+    :type  config: Mapping[str, str]
+    :rtype: Dict[str, int]
+    """
+    if config is None:
+        config = DebugController.APP_SETTINGS
+    setting = lambda key: int(config.get(key, DEFAULT_POOL_SETTINGS[key]))
+    return {
+        'maxPoolSize': setting('DB_MAX_POOL_SIZE'),
+        'connectTimeoutMS': setting('DB_CONNECT_TIMEOUT_MS'),
+        'serverSelectionTimeoutMS': setting('DB_SERVER_SELECTION_TIMEOUT_MS'),
+        # A socket timeout of 0 means that the operations never time out.
+        'socketTimeoutMS': setting('DB_SOCKET_TIMEOUT_MS') or None
+    }
+
+def get_client(uri: str = None) -> MongoClient:
+    """ This function returns the pooled client of the given URI.
+
+    The client is created (and health checked) only on the first call.
+
+    :param uri: The database's URI, the one in the application settings by default.
+    :type  uri: str
+    :rtype: MongoClient
+    """
+    if uri is None:
+        uri = get_mongo_uri()
+    with _clients_lock:
+        client = _clients.get(uri, None)
+        if client is None:
+            client = MongoClient(uri, **get_pool_options())
+            health_check(client, uri)
+            _clients[uri] = client
+    return client
+
+def get_database(database_name: str = None, uri: str = None) -> Database:
+    """ This function returns a database handle from the pooled client.
+
+    :param database_name: The database's name, the debugging database by default.
+    :type  database_name: str
+    :param uri: The database's URI, the one in the application settings by default.
+    :type  uri: str
+    :rtype: Database
+    """
+    if database_name is None:
+        database_name = DebugController.APP_SETTINGS['DEBUG_DB_NAME']
+    return get_client(uri)[database_name]
+
+def health_check(client: MongoClient, uri: str) -> bool:
+    """ This function checks that the server of a new client is reachable.
+
+    An unreachable server is only reported, the client reconnects by itself.
+
+    :param client: The new client.
+    :type  client: MongoClient
+    :param uri: The client's URI.
+    :type  uri: str
+    :rtype: bool
+    """
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        AbinLogging.debugging_logger.warning(f"The database at {uri} is not reachable: {e}")
+        return False
+    return True
+
+def close_clients() -> None:
+    """ This function closes all the pooled clients. """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+atexit.register(close_clients)
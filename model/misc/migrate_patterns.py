@@ -0,0 +1,62 @@
+"""
+This module migrates the BugPatterns collection to the current schema.
+The patterns mined before the complexity was stored are backfilled,
+and the indexes used by the pattern queries are created.
+"""
+from typing import Any, List
+from pymongo import ASCENDING
+import controller.AbinLogging as AbinLogging
+
+# The compound index that turns the pattern lookup into an index range scan.
+PATTERN_INDEX_KEYS = [('bug_metadata.hexdigest', ASCENDING), ('complexity', ASCENDING)]
+
+def backfill_complexity(db_collection: Any) -> int:
+    """ This function stores the complexity of the patterns that do not have it.
+
+    The complexity is the number of abstracted identifiers of the fix,
+    it is computed by the server in a single update.
+
+    :param db_collection: the instance of the collection's connection.
+    :type  db_collection: Collection
+    :rtype: int
+    """
+    update_result = db_collection.update_many(
+        { 'complexity': { '$exists': False } },
+        [ { '$set': { 'complexity': { '$size': { '$objectToArray': "$fix_metadata.map_ids" } } } } ]
+    )
+    AbinLogging.debugging_logger.info(
+        f"Complexity backfilled in {update_result.modified_count} patterns."
+    )
+    return update_result.modified_count
+
+def create_pattern_indexes(db_collection: Any) -> List[str]:
+    """ This function creates the indexes used by the pattern queries, if they do not exist.
+
+    :param db_collection: the instance of the collection's connection.
+    :type  db_collection: Collection
+    :rtype: List[str]
+    """
+    index_names = [ db_collection.create_index(PATTERN_INDEX_KEYS) ]
+    AbinLogging.debugging_logger.info(f"Pattern indexes: {index_names}.")
+    return index_names
+
+def migrate_patterns(db_collection: Any) -> int:
+    """ This function migrates a collection of patterns, it is safe to run it more than once.
+
+    :param db_collection: the instance of the collection's connection.
+    :type  db_collection: Collection
+    :rtype: int
+    """
+    no_patterns = backfill_complexity(db_collection)
+    create_pattern_indexes(db_collection)
+    return no_patterns
+
+if __name__ == "__main__":
+    import yaml
+    import controller.DebugController as DebugController
+    import model.misc.db_client_manager as db_client_manager
+    with open(DebugController.MAIN_DIR.joinpath('config.yml'), 'r') as config_file:
+        DebugController.APP_SETTINGS = yaml.full_load(config_file)
+    config = DebugController.APP_SETTINGS
+    db_connection = db_client_manager.get_database(config['DEBUG_DB_NAME'])
+    migrate_patterns(db_connection[config['DEBUG_DB_PATTERNS_COLLECTION']])
@@ -0,0 +1,163 @@
+"""
+This module maintains the materialized pattern groups of a BugPatterns collection.
+A pattern group holds one document per (bug hexdigest, fix hexdigest) with
+its count, complexity and representative metadata, so the debugging
+queries do not group the raw bug-fixes of every session again.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Union
+from pymongo import ASCENDING, UpdateOne
+import controller.AbinLogging as AbinLogging
+from model.misc.pattern_index import QUERY_GROUPED_PATTERNS, get_pattern_projection
+
+MatchingPattern = Dict[str, Any]
+
+# The index used by the debugging queries on the pattern groups.
+GROUP_INDEX_KEYS = [('_id.bug_hexdigest', ASCENDING), ('complexity', ASCENDING)]
+
+def get_groups_collection_name(patterns_collection_name: str) -> str:
+    """ This function returns the name of the pattern groups' collection of a patterns' collection.
+
+    :param patterns_collection_name: The name of the patterns' collection.
+    :type  patterns_collection_name: str
+    :rtype: str
+    """
+    return f"{patterns_collection_name}Groups"
+
+def get_group_id(bugfix_data: Mapping[str, Any]) -> Dict[str, str]:
+    """ This function returns the group's id of a bug-fix.
+
+    :param bugfix_data: The bug-fix's document.
+    :type  bugfix_data: Mapping[str, Any]
+    :rtype: Dict[str, str]
+    """
+    return {
+        'bug_hexdigest': bugfix_data['bug_metadata']['hexdigest'],
+        'fix_hexdigest': bugfix_data['fix_metadata']['hexdigest']
+    }
+
+def upsert_pattern_groups(groups_collection: Any, bugfixes_data: Iterable[Mapping[str, Any]]) -> int:
+    """ This function adds the newly mined bug-fixes to the pattern groups.
+
+    The count of an existing group is incremented, the representative metadata
+    is the one of the first bug-fix of the group, as in the grouping query.
+
+    :param groups_collection: the instance of the pattern groups' collection.
+    :type  groups_collection: Collection
+    :param bugfixes_data: The mined bug-fixes' documents.
+    :type  bugfixes_data: Iterable[Mapping[str, Any]]
+    :rtype: int
+    """
+    groups = OrderedDict()
+    for bugfix_data in bugfixes_data:
+        group_id = get_group_id(bugfix_data)
+        key = (group_id['bug_hexdigest'], group_id['fix_hexdigest'])
+        if key in groups:
+            groups[key][1] += 1
+            continue
+        representative = {
+            'fix_metadata': bugfix_data['fix_metadata'],
+            'bug_metadata': bugfix_data['bug_metadata'],
+            'available_identifiers': bugfix_data['available_identifiers'],
+            'commit_sha': bugfix_data['commit_sha'],
+            'complexity': bugfix_data.get('complexity', len(bugfix_data['fix_metadata']['map_ids']))
+        }
+        groups[key] = [group_id, 1, representative]
+    if not groups:
+        return 0
+    requests = [
+        UpdateOne({ '_id': group_id },
+                  { '$setOnInsert': representative, '$inc': { 'count_similar': count_similar } },
+                  upsert=True)
+        for (group_id, count_similar, representative) in groups.values()
+    ]
+    groups_collection.bulk_write(requests, ordered=False)
+    return len(requests)
+
+def rebuild_pattern_groups(patterns_collection: Any, groups_collection_name: str = None) -> None:
+    """ This function rebuilds the pattern groups from all the bug-fixes of a collection.
+
+    It covers the collections mined before the pattern groups were maintained,
+    the previous pattern groups are replaced once the new ones are written.
+
+    :param patterns_collection: the instance of the patterns' collection.
+    :type  patterns_collection: Collection
+    :param groups_collection_name: The name of the pattern groups' collection.
+    :type  groups_collection_name: str
+    """
+    if groups_collection_name is None:
+        groups_collection_name = get_groups_collection_name(patterns_collection.name)
+    QUERY = QUERY_GROUPED_PATTERNS + [ { '$out': groups_collection_name } ]
+    patterns_collection.aggregate(QUERY, allowDiskUse=True)
+    groups_collection = patterns_collection.database[groups_collection_name]
+    create_group_indexes(groups_collection)
+    AbinLogging.debugging_logger.info(
+        f"Pattern groups rebuilt in {groups_collection_name}: "
+        f"{groups_collection.estimated_document_count()} groups."
+    )
+
+def has_pattern_groups(groups_collection: Any) -> bool:
+    """ This function checks if a pattern groups' collection exists and is not empty.
+
+    :param groups_collection: the instance of the pattern groups' collection.
+    :type  groups_collection: Collection
+    :rtype: bool
+    """
+    return groups_collection.find_one({}, { '_id': 1 }) is not None
+
+def ensure_pattern_groups(patterns_collection: Any, groups_collection: Any) -> None:
+    """ This function builds the pattern groups if they are missing for an already mined collection.
+
+    The newly mined bug-fixes are upserted into the pattern groups, so they
+    must cover the bug-fixes mined before, or the groups would be incomplete.
+
+    :param patterns_collection: the instance of the patterns' collection.
+    :type  patterns_collection: Collection
+    :param groups_collection: the instance of the pattern groups' collection.
+    :type  groups_collection: Collection
+    """
+    if has_pattern_groups(groups_collection) or patterns_collection.find_one({}, { '_id': 1 }) is None:
+        return
+    rebuild_pattern_groups(patterns_collection, groups_collection.name)
+
+def create_group_indexes(groups_collection: Any) -> List[str]:
+    """ This function creates the indexes used by the debugging queries, if they do not exist.
+
+    :param groups_collection: the instance of the pattern groups' collection.
+    :type  groups_collection: Collection
+    :rtype: List[str]
+    """
+    return [ groups_collection.create_index(GROUP_INDEX_KEYS) ]
+
+def get_matching_groups_query(bug_hexdigest: Union[str, Mapping[str, Any]], max_complexity: int,
+    identifiers_limit: int = 0) -> List[Dict[str, Any]]:
+    """ This function returns the query of the matching patterns on the pattern groups.
+
+    The patterns are identified by their fix and sorted by complexity,
+    as in the grouping query on the raw bug-fixes.
+
+    :param bug_hexdigest: the hexdigest of the abstracted node, or a condition on it (e.g. `$in`).
+    :type  bug_hexdigest: Union[str, Mapping[str, Any]]
+    :param max_complexity: The maximun pattern's complexity allowed.
+    :type  max_complexity: int
+    :param identifiers_limit: The maximum number of available identifiers per node type.
+    :type  identifiers_limit: int
+    :rtype: List[Dict[str, Any]]
+    """
+    return [
+        { '$match': { '_id.bug_hexdigest': bug_hexdigest,
+                      'complexity': { '$lte': max_complexity } } },
+        { '$sort': { 'complexity': 1 } },
+        get_pattern_projection(identifiers_limit),
+        { '$set': { '_id': '$_id.fix_hexdigest' } }
+    ]
+
+if __name__ == "__main__":
+    import yaml
+    import controller.DebugController as DebugController
+    import model.misc.db_client_manager as db_client_manager
+    with open(DebugController.MAIN_DIR.joinpath('config.yml'), 'r') as config_file:
+        DebugController.APP_SETTINGS = yaml.full_load(config_file)
+    config = DebugController.APP_SETTINGS
+    db_connection = db_client_manager.get_database(config['DEBUG_DB_NAME'])
+    rebuild_pattern_groups(db_connection[config['DEBUG_DB_PATTERNS_COLLECTION']])
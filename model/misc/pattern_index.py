@@ -0,0 +1,192 @@
+"""
+This module builds and queries the local pattern index.
+The pattern index is a read-only SQLite file exported from the
+BugPatterns collection; it allows to debug without a MongoDB server.
+"""
+import os
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Union
+from bson import json_util
+import controller.DebugController as DebugController
+import controller.AbinLogging as AbinLogging
+
+MatchingPattern = Dict[str, Any]
+
+# The matching patterns grouped by bug and fix, as in HypothesisGenerator.get_matching_patterns.
+QUERY_GROUPED_PATTERNS = [
+    { '$group': { '_id': { 'bug_hexdigest': '$bug_metadata.hexdigest',
+                           'fix_hexdigest': '$fix_metadata.hexdigest' },
+                'fix_metadata': { '$first': '$fix_metadata' },
+                'bug_metadata': { '$first': '$bug_metadata' },
+                'available_identifiers': { '$first': '$available_identifiers' },
+                'commit_sha': { '$first': '$commit_sha' },
+                'complexity': { '$first': { '$ifNull': [ '$complexity',
+                                { '$size': { '$objectToArray': "$fix_metadata.map_ids" } } ] } },
+                'count_similar': { '$sum': 1 }
+                }
+    }
+]
+
+def get_pattern_projection(identifiers_limit: int = 0) -> Dict[str, Any]:
+    """ This function returns the stage that projects a matching pattern to the fields used by the generator.
+
+    The hypotheses only need the fix's abstraction and mappings, the available identifiers,
+    the complexity and the count; the bug's hexdigest identifies the pattern. The lists of
+    available identifiers are capped to `identifiers_limit` items each (0 means no cap).
+
+    :param identifiers_limit: The maximum number of available identifiers per node type.
+    :type  identifiers_limit: int
+    :rtype: Dict[str, Any]
+    """
+    available_identifiers: Any = 1
+    if identifiers_limit > 0:
+        available_identifiers = { '$arrayToObject': { '$map': {
+            'input': { '$objectToArray': '$available_identifiers' },
+            'as': 'ids',
+            'in': { 'k': '$$ids.k', 'v': { '$slice': [ '$$ids.v', identifiers_limit ] } }
+        } } }
+    return { '$project': {
+        'fix_metadata.abstract_node': 1,
+        'fix_metadata.map_ids': 1,
+        'fix_metadata.map_nodes': 1,
+        'bug_metadata.hexdigest': 1,
+        'available_identifiers': available_identifiers,
+        'complexity': 1,
+        'count_similar': 1
+    } }
+
+_connections: Dict[str, sqlite3.Connection] = {}
+_connections_lock = Lock()
+# The connections are shared with the prefetch thread, the queries are serialized.
+_query_lock = Lock()
+
+def export_pattern_index(db_collection: Any, index_path: Union[str, Path] = None) -> int:
+    """ This function exports the grouped patterns of a collection to a pattern index.
+
+    The index is written to a temporary file that replaces the previous index,
+    thus a running session never reads a partially written index. The available
+    identifiers are exported in full, they are capped when the index is queried.
+
+    :param db_collection: the instance of the collection's connection.
+    :type  db_collection: Collection
+    :param index_path: The pattern index's path.
+    :type  index_path: Union[str, Path]
+    :rtype: int
+    """
+    index_path = Path(DebugController.PATTERN_INDEX_PATH if index_path is None else index_path)
+    temp_path = index_path.with_name(index_path.name + '.tmp')
+    if temp_path.exists():
+        temp_path.unlink()
+    connection = sqlite3.connect(str(temp_path))
+    connection.execute("""
+        CREATE TABLE patterns (
+            bug_hexdigest TEXT NOT NULL,
+            fix_hexdigest TEXT,
+            complexity INTEGER NOT NULL,
+            count_similar INTEGER NOT NULL,
+            pattern TEXT NOT NULL
+        )"""
+    )
+    no_patterns = 0
+    QUERY = QUERY_GROUPED_PATTERNS + [ get_pattern_projection() ]
+    for pattern in db_collection.aggregate(QUERY, allowDiskUse=True):
+        group_id = pattern['_id']
+        # The online query groups by the fix hexdigest only.
+        pattern['_id'] = group_id.get('fix_hexdigest', None)
+        connection.execute('INSERT INTO patterns VALUES (?, ?, ?, ?, ?)', (
+            group_id.get('bug_hexdigest', None), pattern['_id'], pattern['complexity'],
+            pattern['count_similar'], json_util.dumps(pattern))
+        )
+        no_patterns += 1
+    connection.execute('CREATE INDEX patterns_bug ON patterns (bug_hexdigest, complexity)')
+    connection.commit()
+    connection.close()
+    close_pattern_index(index_path)
+    os.replace(temp_path, index_path)
+    AbinLogging.debugging_logger.info(f"Pattern index exported to {index_path}: {no_patterns} patterns.")
+    return no_patterns
+
+def get_connection(index_path: Union[str, Path] = None) -> sqlite3.Connection:
+    """ This function returns the read-only connection to a pattern index.
+
+    :param index_path: The pattern index's path.
+    :type  index_path: Union[str, Path]
+    :rtype: sqlite3.Connection
+    """
+    index_path = Path(DebugController.PATTERN_INDEX_PATH if index_path is None else index_path)
+    key = str(index_path.resolve())
+    with _connections_lock:
+        connection = _connections.get(key, None)
+        if connection is None:
+            uri = f"{index_path.resolve().as_uri()}?mode=ro"
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            _connections[key] = connection
+    return connection
+
+def get_matching_patterns(ast_node_hexdigest: str, max_complexity: int,
+    index_path: Union[str, Path] = None, identifiers_limit: int = None) -> List[MatchingPattern]:
+    """ This function returns the matching patterns of a bug from the pattern index.
+
+    The patterns are sorted by complexity, and their available identifiers
+    are capped (see get_pattern_projection), as in the online query.
+
+    :param ast_node_hexdigest: the hexdigest of the abstracted node.
+    :type  ast_node_hexdigest: str
+    :param max_complexity: The maximun pattern's complexity allowed.
+    :type  max_complexity: int
+    :param index_path: The pattern index's path.
+    :type  index_path: Union[str, Path]
+    :param identifiers_limit: The maximum number of available identifiers per node type,
+    PATTERN_IDENTIFIERS_LIMIT by default.
+    :type  identifiers_limit: int
+    :rtype: List[MatchingPattern]
+    """
+    if identifiers_limit is None:
+        identifiers_limit = DebugController.PATTERN_IDENTIFIERS_LIMIT
+    connection = get_connection(index_path)
+    with _query_lock:
+        rows = connection.execute("""
+            SELECT pattern FROM patterns
+            WHERE bug_hexdigest = ? AND complexity <= ?
+            ORDER BY complexity, rowid""", (ast_node_hexdigest, max_complexity)
+        ).fetchall()
+    matching_patterns = [json_util.loads(pattern) for (pattern,) in rows]
+    if identifiers_limit > 0:
+        for pattern in matching_patterns:
+            pattern['available_identifiers'] = {node_name: ids[:identifiers_limit]
+                for node_name, ids in pattern['available_identifiers'].items()}
+    return matching_patterns
+
+def is_available(index_path: Union[str, Path] = None) -> bool:
+    """ This function checks if the pattern index exists.
+
+    :param index_path: The pattern index's path.
+    :type  index_path: Union[str, Path]
+    :rtype: bool
+    """
+    index_path = Path(DebugController.PATTERN_INDEX_PATH if index_path is None else index_path)
+    return index_path.is_file()
+
+def close_pattern_index(index_path: Union[str, Path] = None) -> None:
+    """ This function closes the connection to a pattern index, if any.
+
+    :param index_path: The pattern index's path.
+    :type  index_path: Union[str, Path]
+    """
+    index_path = Path(DebugController.PATTERN_INDEX_PATH if index_path is None else index_path)
+    with _connections_lock:
+        connection = _connections.pop(str(index_path.resolve()), None)
+    if connection is not None:
+        with _query_lock:
+            connection.close()
+
+if __name__ == "__main__":
+    import yaml
+    import model.misc.db_client_manager as db_client_manager
+    with open(DebugController.MAIN_DIR.joinpath('config.yml'), 'r') as config_file:
+        DebugController.APP_SETTINGS = yaml.full_load(config_file)
+    config = DebugController.APP_SETTINGS
+    db_connection = db_client_manager.get_database(config['DEBUG_DB_NAME'])
+    export_pattern_index(db_connection[config['DEBUG_DB_PATTERNS_COLLECTION']])
@@ -2,9 +2,10 @@
 This module gets the stats from the database.
 """
 from typing import Any, Dict, List, Tuple
-from pymongo import MongoClient, CursorType
+from pymongo import CursorType
 from pymongo.database import Collection
 import controller.DebugController as DebugController
+import model.misc.db_client_manager as db_client_manager
 
 ASTRanking = Tuple[List[str], List[int]]
 
@@ -14,9 +15,7 @@ def get_stats() -> Dict[str, Any]:
     :rtype: Dict[str, Any]
     """
     config = DebugController.APP_SETTINGS
-    MONGO_URI = f"{config['DB_URI']}://{config['DB_HOST']}:{config['DB_PORT']}"
-    client = MongoClient(MONGO_URI)
-    db_connection = client[config['DEBUG_DB_NAME']]
+    db_connection = db_client_manager.get_database(config['DEBUG_DB_NAME'])
     collection_BugPatterns = db_connection[config['DEBUG_DB_PATTERNS_COLLECTION']]
     
     total_bugfixes = stats_total_bugfixes(collection_BugPatterns)
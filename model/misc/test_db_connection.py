@@ -2,10 +2,10 @@
 This module checks the `ConnectionStatus`
 of a given database's settings.
 """
-from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError
 from controller.DebugController import ConnectionStatus
 import controller.AbinLogging as AbinLogging
+import model.misc.db_client_manager as db_client_manager
 
 
 def test_db_connection( uri:str = 'mongodb', 
@@ -31,13 +31,13 @@ def test_db_connection( uri:str = 'mongodb',
     :type  retry_times: int
     :rtype: ConnectionStatus
     """
-    MONGO_URI = f"{uri}://{host}:{port}"
+    MONGO_URI = db_client_manager.get_mongo_uri({'DB_URI': uri, 'DB_HOST': host, 'DB_PORT': port})
     AbinLogging.dbConnection_logger.info(
         f"<pre>Testing connection on {MONGO_URI}...\n\n</pre>"
     )
     for _ in range(retry_times):
         try:
-            client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=1000)
+            client = db_client_manager.get_client(MONGO_URI)
             client.server_info()
         except ServerSelectionTimeoutError as e:
             AbinLogging.dbConnection_logger.info(